@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+# SPDX-License-Identifier: Apache-2.0
+# SPDX-FileCopyrightText: 2025 Andrew Grimberg <tykeal@bardicgrove.org>
+"""Micro benchmarks for pyakuvox fleet queries.
+
+Run with ``python scripts/benchmark.py [--devices N]``.
+"""
+
+from __future__ import annotations
+import argparse
+import gc
+import json
+import random
+import timeit
+import tracemalloc
+
+from pyakuvox.devices import DEVICE_STATUS, DEVICE_TYPE, Device
+from pyakuvox.strings import StringPool
+from pyakuvox.table import DeviceTable
+
+
+def make_rows(count: int, seed: int = 0) -> list[dict[str, str]]:
+    """Generate device rows resembling an API listing."""
+    rng = random.Random(seed)
+    return [
+        {
+            "ID": str(i),
+            "MAC": f"0C:11:05:{i >> 16 & 0xFF:02X}:{i >> 8 & 0xFF:02X}:{i & 0xFF:02X}",
+            "Type": rng.choice("0112"),
+            "Status": rng.choice("011"),
+            "UnitName": f"Building {rng.randrange(50)}",
+            "RoomName": f"Room {rng.randrange(400)}",
+            "Location": f"Floor {rng.randrange(30)}",
+            "VersionNumber": f"{rng.randrange(3)}.{rng.randrange(10)}.0",
+            "Name": f"Device {i}",
+        }
+        for i in range(count)
+    ]
+
+
+def report(name: str, seconds: float, baseline: float | None = None) -> None:
+    """Print a benchmark result line."""
+    line = f"{name:<40} {seconds * 1e3:10.3f} ms"
+    if baseline is not None:
+        line += f"  ({baseline / seconds:,.0f}x faster)"
+    print(line)
+
+
+def bench_table(devices: list[Device], repeat: int) -> None:
+    """Compare list filtering with DeviceTable queries.
+
+    DeviceTable keeps no row masks between queries, so every query below,
+    including the first, is timed cold.
+    """
+    table = DeviceTable()
+    build = timeit.timeit(lambda: DeviceTable().extend("1", devices), number=1)
+    table.extend("1", devices)
+    report("DeviceTable build", build)
+
+    def list_count() -> int:
+        """Count offline door phones by scanning the list."""
+        return len(
+            [
+                d
+                for d in devices
+                if d.Type == DEVICE_TYPE.DOOR_PHONE
+                and d.Status == DEVICE_STATUS.OFFLINE
+            ]
+        )
+
+    def table_count() -> int:
+        """Count offline door phones in the table."""
+        return table.count(Type=DEVICE_TYPE.DOOR_PHONE, Status=DEVICE_STATUS.OFFLINE)
+
+    assert list_count() == table_count()
+    baseline = timeit.timeit(list_count, number=repeat) / repeat
+    report("list: offline door phones", baseline)
+    report(
+        "table: offline door phones",
+        timeit.timeit(table_count, number=repeat) / repeat,
+        baseline,
+    )
+
+    def list_group() -> dict[str, int]:
+        """Count online devices per firmware by scanning the list."""
+        result: dict[str, int] = {}
+        for d in devices:
+            if d.Status == DEVICE_STATUS.ONLINE:
+                result[d.VersionNumber] = result.get(d.VersionNumber, 0) + 1
+        return result
+
+    online = table.filter(Status=DEVICE_STATUS.ONLINE)
+    assert list_group() == online.group_count("VersionNumber")
+    baseline = timeit.timeit(list_group, number=repeat) / repeat
+    report("list: online firmware distribution", baseline)
+    report(
+        "table: online firmware distribution",
+        timeit.timeit(
+            lambda: table.filter(Status=DEVICE_STATUS.ONLINE).group_count(
+                "VersionNumber"
+            ),
+            number=repeat,
+        )
+        / repeat,
+        baseline,
+    )
+
+
+def bench_lookup(devices: list[Device], repeat: int) -> None:
+    """Compare looking up one device by MAC, a high cardinality column."""
+    table = DeviceTable()
+    table.extend("1", devices)
+    macs = [d.MAC for d in devices[:: max(1, len(devices) // repeat)]]
+
+    def list_lookup() -> int:
+        """Find each MAC by scanning the list."""
+        return sum(len([d for d in devices if d.MAC == mac]) for mac in macs)
+
+    def table_lookup() -> int:
+        """Find each MAC in the table."""
+        return sum(table.count(MAC=mac) for mac in macs)
+
+    assert list_lookup() == table_lookup()
+    baseline = timeit.timeit(list_lookup, number=1) / len(macs)
+    report("list: device by MAC", baseline)
+    report(
+        "table: device by MAC",
+        timeit.timeit(table_lookup, number=1) / len(macs),
+        baseline,
+    )
+
+
+def measure_devices(payload: str, pool: StringPool | None) -> float:
+    """Return the MiB held by devices built from a JSON payload."""
+    gc.collect()
+    tracemalloc.start()
+    devices = [Device(row, pool) for row in json.loads(payload)]
+    gc.collect()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del devices
+    return size / 2**20
+
+
+def bench_memory(rows: list[dict[str, str]]) -> None:
+    """Compare memory held by devices with and without a string pool."""
+    # Decoding a response gives every row its own string objects
+    payload = json.dumps(rows)
+    plain = measure_devices(payload, None)
+    pooled = measure_devices(payload, StringPool())
+    print(f"{'devices, no string pool':<40} {plain:10.1f} MiB")
+    print(
+        f"{'devices, string pool':<40} {pooled:10.1f} MiB"
+        f"  ({(plain - pooled) / plain:.0%} saved)"
+    )
+
+
+def main() -> None:
+    """Run the benchmarks."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--devices", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    rows = make_rows(args.devices)
+    devices = [Device(row) for row in rows]
+    print(f"{args.devices:,} devices")
+    bench_table(devices, args.repeat)
+    bench_lookup(devices, args.repeat)
+    bench_memory(rows)
+
+
+if __name__ == "__main__":
+    main()
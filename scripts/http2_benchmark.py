@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+# SPDX-License-Identifier: Apache-2.0
+# SPDX-FileCopyrightText: 2025 Andrew Grimberg <tykeal@bardicgrove.org>
+"""Compare the HTTP/2 transport with HTTP/1.1 for concurrent fan-out.
+
+Two local servers answer ``/property/login`` and
+``/property/selectdevice`` with the same generated device listing after
+the same simulated latency: a threaded HTTP/1.1 server with keep-alive
+and an HTTP/2 server built on ``h2``. The HTTP/2 server speaks cleartext
+HTTP/2 (h2c) with prior knowledge, so no certificate is needed; against
+the real API the protocol is negotiated with ALPN instead. The servers run
+in a separate process so they do not compete with the client for the GIL.
+
+Each mode sends the same number of device listings from a thread pool
+through one ``Auth``:
+
+- ``http1``: the default transport, one ``requests`` call per request
+- ``h2-fallback``: ``HTTP2Transport`` against the HTTP/1.1 server, which
+  after the first response goes back to ``requests``
+- ``http2``: ``HTTP2Transport`` multiplexing over one HTTP/2 connection
+
+For every mode it prints wall time, throughput, latency percentiles and
+the number of TCP connections the server accepted. Requires the http2
+extra (``pip install 'pyakuvox[http2]'``).
+
+Example::
+
+    python scripts/http2_benchmark.py --requests 2000 --concurrency 200
+"""
+
+from __future__ import annotations
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from multiprocessing.connection import Connection
+from multiprocessing.sharedctypes import Synchronized
+from typing import Any
+import argparse
+import asyncio
+import json
+import multiprocessing
+import threading
+import time
+
+import h2.config
+import h2.connection
+import h2.events
+import h2.settings
+
+from pyakuvox.auth import Auth
+from pyakuvox.const import RESULT_SUCCESS, SUBDOMAIN_TEST
+from pyakuvox.transport import HTTP2Transport
+
+
+def listing(devices: int) -> dict[str, bytes]:
+    """Return the response bodies keyed by path."""
+    rows = [
+        {
+            "ID": i,
+            "Relay": "1",
+            "Location": "Lobby",
+            "MAC": f"0C110500{i:04X}",
+            "Type": "1",
+            "Status": "1",
+            "UnitName": "Building 1",
+            "RoomName": f"Room {i}",
+            "Name": f"Device {i}",
+            "VersionNumber": "1.2.3.4",
+        }
+        for i in range(devices)
+    ]
+    return {
+        "/property/login": json.dumps(
+            {"result": RESULT_SUCCESS, "token": "benchmark"}
+        ).encode(),
+        "/property/selectdevice": json.dumps(
+            {"result": RESULT_SUCCESS, "data": {"row": rows}}
+        ).encode(),
+    }
+
+
+class HTTP1Server(ThreadingHTTPServer):
+    """Threaded HTTP/1.1 server with keep-alive."""
+
+    daemon_threads = True
+    request_queue_size = 1024
+
+    def __init__(
+        self, bodies: dict[str, bytes], latency: float, connections: Synchronized
+    ) -> None:
+        """Start listening on a free local port."""
+        super().__init__(("127.0.0.1", 0), _HTTP1Handler)
+        self.bodies = bodies
+        self.latency = latency
+        self.connections = connections
+
+    def process_request(self, request: Any, client_address: Any) -> None:
+        """Count the accepted connection and serve it."""
+        with self.connections.get_lock():
+            self.connections.value += 1
+        super().process_request(request, client_address)
+
+
+class _HTTP1Handler(BaseHTTPRequestHandler):
+    """Answer every request with the body for its path."""
+
+    protocol_version = "HTTP/1.1"
+    # Headers and body are written separately; without this each response
+    # on a kept-alive connection waits for the client's delayed ACK.
+    disable_nagle_algorithm = True
+    server: HTTP1Server
+
+    def _respond(self) -> None:
+        """Send the body after the simulated latency."""
+        length = int(self.headers.get("Content-Length", 0))
+        self.rfile.read(length)
+        time.sleep(self.server.latency)
+        body = self.server.bodies[self.path.split("?")[0]]
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_GET = _respond
+    do_POST = _respond
+
+    def log_message(self, format: str, *args: Any) -> None:
+        """Silence the request log."""
+
+
+class _H2Protocol(asyncio.Protocol):
+    """One HTTP/2 connection of :class:`HTTP2Server`."""
+
+    def __init__(self, server: HTTP2Server) -> None:
+        """Initialize the connection state."""
+        self.server = server
+        self.conn = h2.connection.H2Connection(
+            h2.config.H2Configuration(client_side=False)
+        )
+        self.conn.local_settings = h2.settings.Settings(
+            client=False,
+            initial_values={h2.settings.SettingCodes.MAX_CONCURRENT_STREAMS: 10000},
+        )
+        self.window_updated = asyncio.Event()
+
+    def connection_made(self, transport: asyncio.BaseTransport) -> None:
+        """Send the server preface."""
+        assert isinstance(transport, asyncio.Transport)
+        self.transport = transport
+        with self.server.connections.get_lock():
+            self.server.connections.value += 1
+        self.conn.initiate_connection()
+        self.transport.write(self.conn.data_to_send())
+
+    def data_received(self, data: bytes) -> None:
+        """Start a response for every complete request."""
+        for event in self.conn.receive_data(data):
+            if isinstance(event, h2.events.RequestReceived):
+                path = dict(event.headers)[b":path"].decode().split("?")[0]
+                asyncio.get_running_loop().create_task(
+                    self.respond(event.stream_id, self.server.bodies[path])
+                )
+            elif isinstance(event, h2.events.DataReceived):
+                self.conn.acknowledge_received_data(
+                    event.flow_controlled_length, event.stream_id
+                )
+            elif isinstance(event, h2.events.WindowUpdated):
+                self.window_updated.set()
+            elif isinstance(event, h2.events.ConnectionTerminated):
+                self.transport.close()
+        self.transport.write(self.conn.data_to_send())
+
+    async def respond(self, stream_id: int, body: bytes) -> None:
+        """Send a body after the simulated latency, within flow control."""
+        await asyncio.sleep(self.server.latency)
+        self.conn.send_headers(
+            stream_id,
+            [
+                (":status", "200"),
+                ("content-type", "application/json"),
+                ("content-length", str(len(body))),
+            ],
+        )
+        while body:
+            window = min(
+                self.conn.local_flow_control_window(stream_id),
+                self.conn.max_outbound_frame_size,
+            )
+            if window <= 0:
+                self.transport.write(self.conn.data_to_send())
+                self.window_updated.clear()
+                await self.window_updated.wait()
+                continue
+            self.conn.send_data(stream_id, body[:window])
+            body = body[window:]
+        self.conn.end_stream(stream_id)
+        self.transport.write(self.conn.data_to_send())
+
+
+class HTTP2Server:
+    """Cleartext HTTP/2 server on an asyncio event loop."""
+
+    def __init__(
+        self, bodies: dict[str, bytes], latency: float, connections: Synchronized
+    ) -> None:
+        """Start listening on a free local port."""
+        self.bodies = bodies
+        self.latency = latency
+        self.connections = connections
+        self.loop = asyncio.new_event_loop()
+        server = self.loop.run_until_complete(
+            self.loop.create_server(lambda: _H2Protocol(self), "127.0.0.1", 0)
+        )
+        self.port: int = server.sockets[0].getsockname()[1]
+
+
+def serve(
+    bodies: dict[str, bytes],
+    latency: float,
+    counters: tuple[Synchronized, Synchronized],
+    ports: Connection,
+) -> None:
+    """Run both servers, sending their ports to the parent process."""
+    http1 = HTTP1Server(bodies, latency, counters[0])
+    threading.Thread(target=http1.serve_forever, daemon=True).start()
+    http2 = HTTP2Server(bodies, latency, counters[1])
+    ports.send((http1.server_address[1], http2.port))
+    http2.loop.run_forever()
+
+
+def percentile(values: list[float], pct: float) -> float:
+    """Return a percentile of sorted values."""
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+def run_mode(
+    name: str,
+    auth: Auth,
+    connections: Synchronized,
+    args: argparse.Namespace,
+) -> None:
+    """Send the device listings through an Auth and print the results."""
+    before = connections.value
+    auth.authenticate()
+    headers = {"x-community-id": "1"}
+
+    def one(_: int) -> float:
+        """Send one device listing and return its latency."""
+        start = time.perf_counter()
+        auth.requests("GET", "/property/selectdevice", headers=dict(headers))
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        latencies = sorted(executor.map(one, range(args.requests)))
+    elapsed = time.perf_counter() - start
+    print(
+        f"{name:<14} {elapsed:>8.2f} {args.requests / elapsed:>10.0f} "
+        f"{percentile(latencies, 50) * 1e3:>9.1f} "
+        f"{percentile(latencies, 99) * 1e3:>9.1f} "
+        f"{connections.value - before:>12}"
+    )
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=128)
+    parser.add_argument("--devices", type=int, default=50)
+    parser.add_argument(
+        "--latency", type=float, default=0.05, help="server latency in seconds"
+    )
+    args = parser.parse_args()
+
+    counters = (multiprocessing.Value("i", 0), multiprocessing.Value("i", 0))
+    receiver, sender = multiprocessing.Pipe(duplex=False)
+    server = multiprocessing.Process(
+        target=serve,
+        args=(listing(args.devices), args.latency, counters, sender),
+        daemon=True,
+    )
+    server.start()
+    http1_port, http2_port = receiver.recv()
+    http1_url = f"http://127.0.0.1:{http1_port}"
+    http2_url = f"http://127.0.0.1:{http2_port}"
+    print(
+        f"{args.requests} requests, {args.concurrency} concurrent, "
+        f"{args.devices} devices each, {args.latency * 1e3:.0f} ms server latency"
+    )
+    print(
+        f"{'mode':<14} {'wall s':>8} {'req/s':>10} {'p50 ms':>9} {'p99 ms':>9} "
+        f"{'connections':>12}"
+    )
+    run_mode(
+        "http1",
+        Auth(SUBDOMAIN_TEST, "user", "pass", base_url=http1_url),
+        counters[0],
+        args,
+    )
+    transport = HTTP2Transport()
+    run_mode(
+        "h2-fallback",
+        Auth(SUBDOMAIN_TEST, "user", "pass", base_url=http1_url, transport=transport),
+        counters[0],
+        args,
+    )
+    transport.close()
+    transport = HTTP2Transport(http1=False)
+    run_mode(
+        "http2",
+        Auth(SUBDOMAIN_TEST, "user", "pass", base_url=http2_url, transport=transport),
+        counters[1],
+        args,
+    )
+    transport.close()
+    server.terminate()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,408 @@
+#!/usr/bin/env python3
+# SPDX-License-Identifier: Apache-2.0
+# SPDX-FileCopyrightText: 2025 Andrew Grimberg <tykeal@bardicgrove.org>
+"""Load and soak test pyakuvox against a simulated Akuvox cloud.
+
+The simulated server implements ``/property/login``,
+``/property/comunityinfo`` and ``/property/selectdevice`` with generated
+communities and devices. It can add latency drawn from a distribution,
+expire tokens (answering result 1006), return bursts of 5xx responses and
+send occasional very slow responses.
+
+Worker threads share one ``Akuvox`` client and repeatedly list communities
+or fetch the devices of a random community. Every report interval and at
+the end the harness prints throughput, latency percentiles, errors by
+type, logins and memory growth.
+
+Example, a ten minute soak at full scale::
+
+    python scripts/loadtest.py --communities 10000 --devices-per-community 50 \\
+        --workers 32 --duration 600 --latency lognormal:-4,0.5 \\
+        --token-ttl 120 --error-burst-every 60 --error-burst-length 5
+"""
+
+from __future__ import annotations
+from collections import Counter
+from collections.abc import Callable
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+import argparse
+import json
+import math
+import random
+import resource
+import sys
+import threading
+import time
+import tracemalloc
+import uuid
+
+from pyakuvox.api import Akuvox
+from pyakuvox.auth import Auth
+from pyakuvox.const import (
+    RESULT_INVALID_IDENTITY,
+    RESULT_SUCCESS,
+    SUBDOMAIN_TEST,
+)
+from pyakuvox.events import EVENT_TYPE
+
+
+def parse_latency(spec: str) -> Callable[[random.Random], float]:
+    """Parse a latency distribution in seconds.
+
+    Supported forms are ``fixed:S``, ``uniform:LOW,HIGH``, ``exp:MEAN`` and
+    ``lognormal:MU,SIGMA``.
+    """
+    kind, _, args = spec.partition(":")
+    values = [float(v) for v in args.split(",") if v]
+    if kind == "fixed" and len(values) == 1:
+        return lambda rng: values[0]
+    if kind == "uniform" and len(values) == 2:
+        return lambda rng: rng.uniform(values[0], values[1])
+    if kind == "exp" and len(values) == 1:
+        return lambda rng: rng.expovariate(1 / values[0])
+    if kind == "lognormal" and len(values) == 2:
+        return lambda rng: rng.lognormvariate(values[0], values[1])
+    raise argparse.ArgumentTypeError(f"Invalid latency distribution: {spec}")
+
+
+class SimulatedCloud(ThreadingHTTPServer):
+    """HTTP server imitating the parts of the Akuvox API used by pyakuvox."""
+
+    daemon_threads = True
+
+    def __init__(self, args: argparse.Namespace) -> None:
+        """Start listening on a free local port."""
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.args = args
+        self.latency = parse_latency(args.latency)
+        self.started = time.monotonic()
+        self.tokens: dict[str, float] = {}
+        self.stats: Counter[str] = Counter()
+        self.lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        """Return the base URL of the server."""
+        host, port = self.server_address[:2]
+        return f"http://{host!s}:{port}"
+
+    def in_error_burst(self) -> bool:
+        """Check if the server is currently answering with 5xx errors."""
+        every = self.args.error_burst_every
+        if not every:
+            return False
+        elapsed = time.monotonic() - self.started
+        return elapsed % every >= every - self.args.error_burst_length
+
+    def issue_token(self) -> str:
+        """Create a token that expires after the configured TTL."""
+        token = uuid.uuid4().hex
+        with self.lock:
+            self.tokens[token] = time.monotonic() + self.args.token_ttl
+            self.stats["logins"] += 1
+        return token
+
+    def token_valid(self, token: str | None) -> bool:
+        """Check a token, forgetting it once it has expired."""
+        with self.lock:
+            expires = self.tokens.get(token or "")
+            if expires is None:
+                return False
+            if expires < time.monotonic():
+                del self.tokens[token or ""]
+                self.stats["expired_tokens"] += 1
+                return False
+            return True
+
+    def communities(self) -> list[dict[str, str]]:
+        """Return the community listing."""
+        return [
+            {"ID": str(i), "Location": f"Community {i}"}
+            for i in range(self.args.communities)
+        ]
+
+    def devices(self, community_id: str) -> list[dict[str, str]]:
+        """Return the deterministic device rows of a community."""
+        rng = random.Random(community_id)
+        return [
+            {
+                "ID": f"{community_id}-{i}",
+                "MAC": f"0C:11:05:{rng.randrange(1 << 24):06X}",
+                "Type": rng.choice("0112"),
+                "Status": "1" if rng.random() < 0.9 else "0",
+                "UnitName": f"Building {rng.randrange(20)}",
+                "RoomName": f"Room {rng.randrange(200)}",
+                "Location": f"Floor {rng.randrange(10)}",
+                "VersionNumber": f"{rng.randrange(3)}.{rng.randrange(5)}.0",
+                "Name": f"Device {i}",
+                "Relay": "",
+            }
+            for i in range(self.args.devices_per_community)
+        ]
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """Request handler of the simulated cloud."""
+
+    server: SimulatedCloud
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format: str, *args: Any) -> None:
+        """Silence per-request logging."""
+
+    def _reply(self, status: int, payload: Any) -> None:
+        """Send a JSON response."""
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _handle(self) -> None:
+        """Answer a request after the simulated delays and failures."""
+        server = self.server
+        args = server.args
+        rng = random.Random()
+        length = int(self.headers.get("Content-Length") or 0)
+        if length:
+            self.rfile.read(length)
+
+        delay = server.latency(rng)
+        if args.slow_rate and rng.random() < args.slow_rate:
+            delay += args.slow_latency
+            server.stats["slow_responses"] += 1
+        time.sleep(max(0.0, delay))
+
+        path = self.path.split("?", 1)[0]
+        server.stats[f"requests {path}"] += 1
+        if server.in_error_burst():
+            server.stats["5xx_responses"] += 1
+            self._reply(503, {"message": "Service Unavailable"})
+            return
+
+        if path == "/property/login":
+            self._reply(
+                200,
+                {
+                    "result": RESULT_SUCCESS,
+                    "token": server.issue_token(),
+                    "communityID": "0",
+                },
+            )
+            return
+        if not server.token_valid(self.headers.get("x-auth-token")):
+            self._reply(
+                200, {"result": RESULT_INVALID_IDENTITY, "message": "Invalid identity"}
+            )
+            return
+        if path == "/property/comunityinfo":
+            self._reply(200, {"result": RESULT_SUCCESS, "data": server.communities()})
+        elif path == "/property/selectdevice":
+            rows = server.devices(self.headers.get("x-community-id", ""))
+            self._reply(200, {"result": RESULT_SUCCESS, "data": {"row": rows}})
+        else:
+            self._reply(404, {"message": "Not Found"})
+
+    do_GET = _handle
+    do_POST = _handle
+
+
+class Recorder:
+    """Thread safe collector of operation outcomes."""
+
+    def __init__(self) -> None:
+        """Initialize empty counters."""
+        self.lock = threading.Lock()
+        self.latencies: list[float] = []
+        self.errors: Counter[str] = Counter()
+        self.operations = 0
+
+    def record(self, seconds: float, error: BaseException | None) -> None:
+        """Record one operation."""
+        with self.lock:
+            self.operations += 1
+            self.latencies.append(seconds)
+            if error is not None:
+                self.errors[type(error).__name__] += 1
+
+    def drain(self) -> tuple[int, list[float], Counter[str]]:
+        """Return and reset the counters of the current interval."""
+        with self.lock:
+            result = (self.operations, self.latencies, self.errors)
+            self.operations, self.latencies, self.errors = 0, [], Counter()
+        return result
+
+
+def percentile(values: list[float], pct: float) -> float:
+    """Return a percentile of already sorted values."""
+    if not values:
+        return math.nan
+    index = min(len(values) - 1, max(0, math.ceil(pct / 100 * len(values)) - 1))
+    return values[index]
+
+
+def memory_mb() -> tuple[float, float]:
+    """Return traced Python heap and peak RSS in MiB."""
+    current, _ = tracemalloc.get_traced_memory()
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform != "darwin":
+        rss *= 1024
+    return current / 2**20, rss / 2**20
+
+
+def report(
+    label: str,
+    seconds: float,
+    operations: int,
+    latencies: list[float],
+    errors: Counter[str],
+    logins: int,
+    baseline_heap: float,
+) -> None:
+    """Print one report line."""
+    latencies = sorted(latencies)
+    heap, rss = memory_mb()
+    error_text = ", ".join(f"{k}={v}" for k, v in errors.most_common()) or "none"
+    print(
+        f"[{label}] ops={operations} rate={operations / seconds:.1f}/s "
+        f"p50={percentile(latencies, 50) * 1e3:.1f}ms "
+        f"p90={percentile(latencies, 90) * 1e3:.1f}ms "
+        f"p99={percentile(latencies, 99) * 1e3:.1f}ms "
+        f"max={(latencies[-1] if latencies else math.nan) * 1e3:.1f}ms "
+        f"logins={logins} heap={heap:.1f}MiB (+{heap - baseline_heap:.1f}) "
+        f"rss_peak={rss:.1f}MiB errors: {error_text}",
+        flush=True,
+    )
+
+
+def run(args: argparse.Namespace) -> None:
+    """Run the load test."""
+    server = SimulatedCloud(args)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    print(f"Simulated cloud at {server.url}", flush=True)
+
+    tracemalloc.start()
+    auth = Auth(
+        SUBDOMAIN_TEST,
+        "loadtest",
+        "loadtest",
+        timeout=(args.connect_timeout, args.read_timeout),
+        base_url=server.url,
+    )
+    akuvox = Akuvox(auth)
+    logins = Counter[str]()
+    akuvox.events.subscribe(
+        lambda event: logins.update(["client"]), EVENT_TYPE.AUTHENTICATED
+    )
+    community_ids = [str(i) for i in range(args.communities)]
+    recorder = Recorder()
+    stop = threading.Event()
+    baseline_heap = memory_mb()[0]
+
+    def worker(seed: int) -> None:
+        """Issue random listing and device calls until stopped."""
+        rng = random.Random(seed)
+        while not stop.is_set():
+            start = time.perf_counter()
+            error: BaseException | None = None
+            try:
+                if rng.random() < args.listing_rate:
+                    akuvox.communities.get_communities(deadline=args.deadline)
+                else:
+                    community = akuvox.community(rng.choice(community_ids))
+                    community.load_devices(refresh=True, deadline=args.deadline)
+            except Exception as e:
+                error = e
+            recorder.record(time.perf_counter() - start, error)
+
+    threads = [
+        threading.Thread(target=worker, args=(seed,), daemon=True)
+        for seed in range(args.workers)
+    ]
+    started = time.monotonic()
+    for thread in threads:
+        thread.start()
+
+    totals: list[float] = []
+    total_errors: Counter[str] = Counter()
+    total_ops = 0
+    try:
+        while time.monotonic() - started < args.duration:
+            time.sleep(min(args.report_every, args.duration))
+            operations, latencies, errors = recorder.drain()
+            totals.extend(latencies)
+            total_errors.update(errors)
+            total_ops += operations
+            report(
+                f"{time.monotonic() - started:7.1f}s",
+                args.report_every,
+                operations,
+                latencies,
+                errors,
+                logins["client"],
+                baseline_heap,
+            )
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stop.set()
+        for thread in threads:
+            thread.join(args.read_timeout + 1)
+        operations, latencies, errors = recorder.drain()
+        totals.extend(latencies)
+        total_errors.update(errors)
+        total_ops += operations
+        server.shutdown()
+
+    report(
+        "total",
+        time.monotonic() - started,
+        total_ops,
+        totals,
+        total_errors,
+        logins["client"],
+        baseline_heap,
+    )
+    print("Server:", dict(server.stats), flush=True)
+
+
+def main() -> None:
+    """Parse arguments and run the load test."""
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--communities", type=int, default=100)
+    parser.add_argument("--devices-per-community", type=int, default=50)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=30, help="seconds")
+    parser.add_argument("--report-every", type=float, default=5, help="seconds")
+    parser.add_argument(
+        "--listing-rate",
+        type=float,
+        default=0.01,
+        help="share of operations listing all communities",
+    )
+    parser.add_argument(
+        "--latency",
+        default="fixed:0.005",
+        help="server latency distribution in seconds, e.g. lognormal:-4,0.5",
+    )
+    parser.add_argument("--slow-rate", type=float, default=0.0)
+    parser.add_argument("--slow-latency", type=float, default=5.0)
+    parser.add_argument("--token-ttl", type=float, default=3600)
+    parser.add_argument(
+        "--error-burst-every", type=float, default=0, help="seconds, 0 disables"
+    )
+    parser.add_argument("--error-burst-length", type=float, default=2)
+    parser.add_argument("--connect-timeout", type=float, default=10)
+    parser.add_argument("--read-timeout", type=float, default=60)
+    parser.add_argument("--deadline", type=float, default=None)
+    args = parser.parse_args()
+    parse_latency(args.latency)
+    run(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+# SPDX-License-Identifier: Apache-2.0
+# SPDX-FileCopyrightText: 2025 Andrew Grimberg <tykeal@bardicgrove.org>
+"""Reset per-process state of tracked objects in forked children.
+
+:meta private:
+"""
+
+from __future__ import annotations
+from typing import Protocol
+import os
+import weakref
+
+
+class ForkSafe(Protocol):
+    """Object holding locks or threads that must be recreated after fork."""
+
+    def _reset_locks(self) -> None:
+        """Recreate locks and forget threads of the parent process."""
+
+
+_TRACKED: weakref.WeakSet[ForkSafe] = weakref.WeakSet()
+
+
+def track(obj: ForkSafe) -> None:
+    """Reset an object's locks in every child forked from this process.
+
+    A lock held by another thread at fork time would otherwise stay locked
+    forever in the child, where that thread does not exist.
+
+    :param obj: The object to track.
+    :type obj: ForkSafe
+    """
+    _TRACKED.add(obj)
+
+
+def _after_fork_in_child() -> None:
+    """Reset every tracked object in a new child process."""
+    for obj in list(_TRACKED):
+        obj._reset_locks()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
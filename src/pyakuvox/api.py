@@ -3,19 +3,152 @@
 """API for interacting with Akuvox services."""
 
 from __future__ import annotations
+from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
 
 from .auth import Auth
-from .communities import Communities
+from .cache import DiskCache
+from .communities import Communities, Community
+from .deadline import within
+from .devices import Device
+from .events import EventBus
+from .exceptions import UnknownError
+from .profiling import PROFILER, Profiler, profiled
+from .strings import StringPool
 
 
 class Akuvox:
     """API for interacting with Akuvox services."""
 
-    def __init__(self, auth: Auth) -> None:
+    def __init__(
+        self,
+        auth: Auth,
+        cache: DiskCache | None = None,
+        soft_ttl: float | None = None,
+        pool: StringPool | None = None,
+        profile: bool = False,
+    ) -> None:
         """Initialize the Akuvox API with authentication.
 
         :param auth: An instance of Auth for authentication.
         :type auth: Auth
+        :param cache: Optional on-disk cache for community and device
+            listings. Without a namespace of its own, entries are kept apart
+            per account by the API URL and username of ``auth``.
+        :type cache: DiskCache | None
+        :param soft_ttl: Optional age in seconds after which device reads
+            return the cached list and refresh it in the background.
+        :type soft_ttl: float | None
+        :param pool: Pool deduplicating strings repeated across devices.
+            Defaults to a new pool for this client.
+        :type pool: StringPool | None
+        :param profile: Enable profiling for the whole process. The
+            :attr:`profiler` is shared, so it records the API calls of every
+            client, and stays enabled after this client is gone. Profiling
+            can also be enabled by setting ``PYAKUVOX_PROFILE=1``.
+        :type profile: bool
+
+        The client publishes logins and listing changes on :attr:`events`.
+        The bus is attached to ``auth``, so an Auth should back one client.
         """
+        if cache is not None and not cache.namespace:
+            cache = cache.with_namespace(f"{auth.base_url}|{auth.username}")
         self.auth = auth
-        self.communities = Communities(auth)
+        self.cache = cache
+        self.soft_ttl = soft_ttl
+        self.pool = pool if pool is not None else StringPool()
+        self.events = EventBus()
+        auth.events = self.events
+        if profile:
+            PROFILER.enable()
+        self.communities = Communities(auth, cache, soft_ttl, self.events, self.pool)
+        self._communities: dict[str, Community] = {}
+
+    @property
+    def profiler(self) -> Profiler:
+        """Return the profiler recording the API calls of this process."""
+        return PROFILER
+
+    def community(self, community_id: str | None = None) -> Community:
+        """Return a community by ID without listing all communities.
+
+        Repeated calls with the same ID return the same instance, so its
+        loaded devices are reused. The community's ``Location`` is not known
+        without a listing and is left empty.
+
+        :param community_id: The community ID. Defaults to the community
+            returned by the login.
+        :type community_id: str | None
+        :return: The community.
+        :rtype: Community
+        :raises UnknownError: If no ID is given and the login returned none.
+        """
+        if community_id is None:
+            self.auth.ensure_authenticated()
+            community_id = self.auth.community_id
+            if community_id is None:
+                raise UnknownError("Login did not return a community ID.")
+        community_id = str(community_id)
+        community = self._communities.get(community_id)
+        if community is None:
+            community = self._communities.setdefault(
+                community_id,
+                Community(
+                    {"ID": community_id},
+                    self.auth,
+                    self.cache,
+                    self.soft_ttl,
+                    self.events,
+                    self.pool,
+                ),
+            )
+        return community
+
+    @profiled("Akuvox.devices_for")
+    def devices_for(
+        self,
+        community_ids: Iterable[str],
+        refresh: bool = False,
+        deadline: float | None = None,
+        max_workers: int = 8,
+    ) -> dict[str, list[Device]]:
+        """Return the devices of several known communities.
+
+        Communities are fetched concurrently and the community listing is
+        never requested.
+
+        :param community_ids: The IDs of the communities.
+        :type community_ids: Iterable[str]
+        :param refresh: Fetch the devices even if they are already loaded.
+        :type refresh: bool
+        :param deadline: Optional time budget in seconds for all fetches.
+        :type deadline: float | None
+        :param max_workers: Maximum number of concurrent fetches.
+        :type max_workers: int
+        :return: A mapping of community ID to its devices.
+        :rtype: dict[str, list[Device]]
+        """
+        communities = [self.community(cid) for cid in community_ids]
+        if not communities:
+            return {}
+
+        def load(community: Community) -> list[Device]:
+            """Load the devices of ``community``."""
+            return community.load_devices(refresh)
+
+        with within(deadline):
+            # Log in once up front instead of racing in every worker
+            self.auth.ensure_authenticated()
+            workers = min(max_workers, len(communities))
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                # Each task runs in a copy of this context so the deadline
+                # applies in the worker threads too
+                futures = [
+                    executor.submit(copy_context().run, load, community)
+                    for community in communities
+                ]
+                return {
+                    community.ID: future.result()
+                    for community, future in zip(communities, futures)
+                }
@@ -3,18 +3,30 @@
 """Authentication and session management for the Akuvox system."""
 
 from __future__ import annotations
-from typing import Final
+from typing import TYPE_CHECKING, Any, Final
+import threading
 
 import requests
 
+from . import _forksafe
+from .breaker import CircuitBreaker
 from .const import BASE_DOMAIN
-from .const import DEFAULT_TIMEOUT
+from .const import DEFAULT_CONNECT_TIMEOUT
+from .const import DEFAULT_READ_TIMEOUT
 from .const import RESULTS
 from .const import RESULT_INVALID_USERNAME_OR_PASSWORD
 from .const import RESULT_SUCCESS
 from .const import RESULT_UNKNOWN
 from .const import SUBDOMAINS_LIST
-from .exceptions import NotAuthenticatedError, UnknownError
+from .deadline import Deadline, Timeout, acquire, within
+from .events import EVENT_TYPE, Event, EventBus
+from .exceptions import DeadlineTimeoutError, NotAuthenticatedError
+from .exceptions import RequestFailedError, UnknownError
+from .profiling import PROFILER, SECTION_JSON, SECTION_NETWORK, SECTION_RESULT
+from .profiling import profiled
+
+if TYPE_CHECKING:
+    from .transport import HTTP2Transport
 
 
 def _raise_for_result(result: int, message: str | None = None) -> None:
@@ -46,32 +58,65 @@ def _requests(method: str, url: str, **kwargs) -> dict:
     :type method: str
     :param url: The URL to send the request to.
     :type url: str
-    :param kwargs: Additional keyword arguments for the request.
+    :param kwargs: Additional keyword arguments for the request. A
+        ``transport`` argument sends the request through it instead of
+        ``requests``.
     :return: The parsed JSON response from the Akuvox API.
     :rtype: dict
+    :raises DeadlineExceededError: If the current deadline passes.
 
     :meta private:
     """
+    timeout = kwargs.pop("timeout", (DEFAULT_CONNECT_TIMEOUT, DEFAULT_READ_TIMEOUT))
+    deadline = Deadline.current()
+    if deadline is not None:
+        timeout = deadline.clamp(timeout)
+    kwargs["timeout"] = timeout
+    transport = kwargs.pop("transport", None)
     try:
-        kwargs.setdefault("timeout", DEFAULT_TIMEOUT)
         kwargs.setdefault("verify", True)  # Ensure SSL verification is enabled
-        response = requests.request(method, url, **kwargs)
-        response.raise_for_status()
-
-        json_response = response.json()
-        _raise_for_result(
-            json_response.get("result", RESULT_UNKNOWN), json_response.get("message")
-        )
+        with PROFILER.section(SECTION_NETWORK):
+            if transport is None:
+                response = requests.request(method, url, **kwargs)
+                response.raise_for_status()
+            else:
+                response = transport.request(method, url, **kwargs)
+
+        with PROFILER.section(SECTION_JSON):
+            try:
+                json_response = response.json()
+            except ValueError as e:
+                # httpx raises a plain JSONDecodeError, which unlike that of
+                # requests is not a RequestException
+                raise requests.RequestException(f"Invalid JSON response: {e}") from e
+        with PROFILER.section(SECTION_RESULT):
+            _raise_for_result(
+                json_response.get("result", RESULT_UNKNOWN),
+                json_response.get("message"),
+            )
 
         return json_response
+    except requests.Timeout as e:
+        if deadline is not None and deadline.expired:
+            raise DeadlineTimeoutError(f"Request failed: {e}")
+        raise RequestFailedError(f"Request failed: {e}")
     except requests.RequestException as e:
-        raise UnknownError(f"Request failed: {e}")
+        raise RequestFailedError(f"Request failed: {e}")
 
 
 class Auth:
     """Class to handle authentication and session management for Akuvox."""
 
-    def __init__(self, subdomain: str, username: str, password: str) -> None:
+    def __init__(
+        self,
+        subdomain: str,
+        username: str,
+        password: str,
+        timeout: Timeout = (DEFAULT_CONNECT_TIMEOUT, DEFAULT_READ_TIMEOUT),
+        breaker: CircuitBreaker | None = None,
+        base_url: str | None = None,
+        transport: HTTP2Transport | None = None,
+    ) -> None:
         """Initialize the Auth with a specific subdomain.
 
         :param subdomain: The subdomain to use for the Akuvox API.
@@ -80,14 +125,33 @@ class Auth:
         :type username: str
         :param password: The password for authentication.
         :type password: str
+        :param timeout: Request timeout in seconds, either a single value or
+            a (connect, read) pair.
+        :type timeout: float | tuple[float, float]
+        :param breaker: Optional circuit breaker guarding every request.
+        :type breaker: CircuitBreaker | None
+        :param base_url: Optional API URL overriding the one derived from the
+            subdomain, for example a proxy or a simulated server.
+        :type base_url: str | None
+        :param transport: Optional HTTP/2 transport sending every request
+            over shared, multiplexed connections.
+        :type transport: HTTP2Transport | None
         """
         if subdomain not in SUBDOMAINS_LIST:
             raise ValueError(
                 f"Invalid subdomain: {subdomain}. Must be one of {SUBDOMAINS_LIST}."
             )
-        self.base_url: Final[str] = f"https://api.{subdomain}.{BASE_DOMAIN}"
+        self.base_url: Final[str] = (
+            base_url.rstrip("/")
+            if base_url is not None
+            else f"https://api.{subdomain}.{BASE_DOMAIN}"
+        )
         self.username: Final[str] = username
         self.password: Final[str] = password
+        self.timeout: Timeout = timeout
+        self.breaker: CircuitBreaker | None = breaker
+        self.transport: HTTP2Transport | None = transport
+        self.events: EventBus | None = None
 
         self._token: str | None = None
         self._grade: str | None = None
@@ -95,30 +159,62 @@ class Auth:
         self._timezone: str | None = None
         self._community_id: str | None = None
         self._role: str | None = None
+        self._reset_locks()
+        _forksafe.track(self)
 
-    def authenticate(self) -> None:
-        """Authenticate the user with the provided credentials."""
-        url = f"{self.base_url}/property/login"
+    def _reset_locks(self) -> None:
+        """Create the lock serializing logins.
 
+        :meta private:
+        """
+        self._lock = threading.RLock()
+
+    def __getstate__(self) -> dict[str, Any]:
+        """Return the state to pickle, including the token but no lock."""
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        """Restore a pickled Auth without logging in again."""
+        self.__dict__.update(state)
+        self._reset_locks()
+        _forksafe.track(self)
+
+    @profiled("Auth.authenticate")
+    def authenticate(self, deadline: float | None = None) -> None:
+        """Authenticate the user with the provided credentials.
+
+        :param deadline: Optional time budget in seconds for the login.
+        :type deadline: float | None
+        :raises DeadlineExceededError: If the deadline passes first.
+        """
         payload = {
             "Account": self.username,
             "passwd": self.password,
         }
 
-        data = _requests("POST", url, json=payload)
+        # The deadline also bounds the wait for a login in another thread
+        with within(deadline), acquire(self._lock):
+            data = self._send("POST", "/property/login", json=payload)
 
-        key_to_attr = {
-            "token": "_token",
-            "grade": "_grade",
-            "account": "_account",
-            "timeZone": "_timezone",
-            "communityID": "_community_id",
-            "Role": "_role",
-        }
+            # The token is assigned last so a thread that sees it also sees
+            # the rest of the login state.
+            key_to_attr = {
+                "grade": "_grade",
+                "account": "_account",
+                "timeZone": "_timezone",
+                "communityID": "_community_id",
+                "Role": "_role",
+                "token": "_token",
+            }
 
-        for key, attr in key_to_attr.items():
-            if key in data:
-                setattr(self, attr, data[key])
+            for key, attr in key_to_attr.items():
+                if key in data:
+                    setattr(self, attr, data[key])
+
+        if self.events is not None:
+            self.events.emit(Event(EVENT_TYPE.AUTHENTICATED, self))
 
     @property
     def token(self) -> str:
@@ -172,23 +268,58 @@ class Auth:
         """Return a user-friendly string representation of the Auth object."""
         return self.__repr__()
 
-    def requests(self, method: str, path: str, **kwargs) -> dict:
+    def ensure_authenticated(self, deadline: float | None = None) -> None:
+        """Authenticate unless the user already is.
+
+        Threads calling this at the same time share a single login. Waiting
+        for the login of another thread counts against the deadline.
+
+        :param deadline: Optional time budget in seconds for the login.
+        :type deadline: float | None
+        :raises DeadlineExceededError: If the deadline passes first.
+        """
+        if not self.is_authenticated:
+            with within(deadline), acquire(self._lock):
+                # Another thread may have logged in while we waited
+                if not self.is_authenticated:
+                    self.authenticate()
+
+    @profiled("Auth.requests")
+    def requests(
+        self, method: str, path: str, deadline: float | None = None, **kwargs
+    ) -> dict:
         """Make a request to the Akuvox API using the authenticated session.
 
         :param method: HTTP method to use (e.g., 'GET', 'POST').
         :type method: str
         :param path: The API endpoint to send the request to.
         :type path: str
+        :param deadline: Optional time budget in seconds covering the login,
+            if one is needed, and the request.
+        :type deadline: float | None
         :param kwargs: Additional keyword arguments for the request.
         :return: The response from the Akuvox API.
         :rtype: dict
         """
-        if not self.is_authenticated:
-            self.authenticate()
+        with within(deadline):
+            self.ensure_authenticated()
+
+            if "headers" not in kwargs:
+                kwargs["headers"] = {}
+            kwargs["headers"]["x-auth-token"] = self.token
 
-        url = f"{self.base_url}/{path.lstrip('/')}"
-        if "headers" not in kwargs:
-            kwargs["headers"] = {}
-        kwargs["headers"]["x-auth-token"] = self.token
+            return self._send(method, path, **kwargs)
 
-        return _requests(method, url, **kwargs)
+    def _send(self, method: str, path: str, **kwargs) -> dict:
+        """Send a request through the circuit breaker, if one is configured.
+
+        :meta private:
+        """
+        path = f"/{path.lstrip('/')}"
+        url = f"{self.base_url}{path}"
+        kwargs.setdefault("timeout", self.timeout)
+        if self.transport is not None:
+            kwargs["transport"] = self.transport
+        if self.breaker is None:
+            return _requests(method, url, **kwargs)
+        return self.breaker.call(self.base_url, path, _requests, method, url, **kwargs)
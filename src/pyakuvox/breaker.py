@@ -0,0 +1,207 @@
+# SPDX-License-Identifier: Apache-2.0
+# SPDX-FileCopyrightText: 2025 Andrew Grimberg <tykeal@bardicgrove.org>
+"""Circuit breaker for requests to the Akuvox API."""
+
+from __future__ import annotations
+from collections import deque
+from collections.abc import Callable
+from enum import StrEnum
+from typing import Any, TypeVar
+import threading
+import time
+
+from . import _forksafe
+from .exceptions import CircuitOpenError, DeadlineTimeoutError, RequestFailedError
+
+T = TypeVar("T")
+
+
+class CIRCUIT_STATE(StrEnum):
+    """Circuit state enumeration."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class _Circuit:
+    """State of a single circuit.
+
+    :meta private:
+    """
+
+    def __init__(self, window: int) -> None:
+        """Initialize a closed circuit."""
+        self.state: CIRCUIT_STATE = CIRCUIT_STATE.CLOSED
+        self.outcomes: deque[bool] = deque(maxlen=window)
+        self.opened_at: float = 0.0
+        self.probing: bool = False
+
+
+class CircuitBreaker:
+    """Circuit breakers keyed by base URL and path.
+
+    Each key tracks the outcome of its most recent requests. Once at least
+    ``minimum_calls`` outcomes are known and the share of failures reaches
+    ``failure_threshold`` the circuit opens, and requests fail immediately
+    with :class:`CircuitOpenError` instead of waiting on a degraded server.
+    After ``reset_timeout`` seconds a single probe request is let through;
+    its success closes the circuit and its failure opens it again.
+
+    Only requests that got no usable response count as failures, including
+    requests that timed out because their deadline passed. Error results
+    returned by the API do not, nor do requests never sent because the
+    deadline had already passed.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: float = 0.5,
+        minimum_calls: int = 5,
+        window: int = 20,
+        reset_timeout: float = 30.0,
+    ) -> None:
+        """Initialize the circuit breaker.
+
+        :param failure_threshold: Share of failed requests, between 0 and 1,
+            that opens a circuit.
+        :type failure_threshold: float
+        :param minimum_calls: Number of outcomes required before a circuit
+            may open.
+        :type minimum_calls: int
+        :param window: Number of recent outcomes tracked per circuit.
+        :type window: int
+        :param reset_timeout: Seconds an open circuit waits before probing.
+        :type reset_timeout: float
+        """
+        if not 0 < failure_threshold <= 1:
+            raise ValueError(
+                f"Invalid failure_threshold: {failure_threshold}. "
+                "Must be greater than 0 and at most 1."
+            )
+        self.failure_threshold = failure_threshold
+        self.minimum_calls = minimum_calls
+        self.window = window
+        self.reset_timeout = reset_timeout
+        self._circuits: dict[tuple[str, str], _Circuit] = {}
+        self._reset_locks()
+        _forksafe.track(self)
+
+    def _reset_locks(self) -> None:
+        """Create the lock guarding circuit state.
+
+        :meta private:
+        """
+        self._lock = threading.Lock()
+
+    def __getstate__(self) -> dict[str, Any]:
+        """Return the state to pickle, including circuits but no lock."""
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        """Restore a pickled circuit breaker."""
+        self.__dict__.update(state)
+        self._reset_locks()
+        _forksafe.track(self)
+
+    def state(self, base_url: str, path: str) -> CIRCUIT_STATE:
+        """Return the state of a circuit.
+
+        :param base_url: The base URL of the API.
+        :type base_url: str
+        :param path: The API endpoint.
+        :type path: str
+        :return: The circuit state.
+        :rtype: CIRCUIT_STATE
+        """
+        with self._lock:
+            circuit = self._circuits.get((base_url, path))
+            return CIRCUIT_STATE.CLOSED if circuit is None else circuit.state
+
+    def call(
+        self, base_url: str, path: str, func: Callable[..., T], *args, **kwargs
+    ) -> T:
+        """Call a function through the circuit of a base URL and path.
+
+        :param base_url: The base URL of the API.
+        :type base_url: str
+        :param path: The API endpoint.
+        :type path: str
+        :param func: The function making the request.
+        :param args: Positional arguments for the function.
+        :param kwargs: Keyword arguments for the function.
+        :return: The function's return value.
+        :raises CircuitOpenError: If the circuit rejects the request.
+        """
+        circuit = self._acquire(base_url, path)
+        try:
+            result = func(*args, **kwargs)
+        except (RequestFailedError, DeadlineTimeoutError):
+            self._record(circuit, False)
+            raise
+        except BaseException:
+            self._release(circuit)
+            raise
+        self._record(circuit, True)
+        return result
+
+    def _acquire(self, base_url: str, path: str) -> _Circuit:
+        """Admit a request to a circuit or reject it.
+
+        :meta private:
+        """
+        with self._lock:
+            circuit = self._circuits.get((base_url, path))
+            if circuit is None:
+                circuit = self._circuits[(base_url, path)] = _Circuit(self.window)
+            if circuit.state == CIRCUIT_STATE.CLOSED:
+                return circuit
+
+            waited = time.monotonic() - circuit.opened_at
+            if circuit.state == CIRCUIT_STATE.OPEN and waited >= self.reset_timeout:
+                circuit.state = CIRCUIT_STATE.HALF_OPEN
+            if circuit.state == CIRCUIT_STATE.HALF_OPEN and not circuit.probing:
+                circuit.probing = True
+                return circuit
+
+            raise CircuitOpenError(
+                f"Circuit for {base_url}{path} is {circuit.state}; request rejected.",
+                retry_after=max(0.0, self.reset_timeout - waited),
+            )
+
+    def _release(self, circuit: _Circuit) -> None:
+        """Release a probe that ended without a recorded outcome.
+
+        :meta private:
+        """
+        with self._lock:
+            circuit.probing = False
+
+    def _record(self, circuit: _Circuit, success: bool) -> None:
+        """Record the outcome of an admitted request.
+
+        :meta private:
+        """
+        with self._lock:
+            if circuit.state == CIRCUIT_STATE.HALF_OPEN:
+                circuit.probing = False
+                if success:
+                    circuit.state = CIRCUIT_STATE.CLOSED
+                    circuit.outcomes.clear()
+                else:
+                    circuit.state = CIRCUIT_STATE.OPEN
+                    circuit.opened_at = time.monotonic()
+                return
+
+            circuit.outcomes.append(success)
+            total = len(circuit.outcomes)
+            failures = total - sum(circuit.outcomes)
+            if (
+                circuit.state == CIRCUIT_STATE.CLOSED
+                and total >= self.minimum_calls
+                and failures / total >= self.failure_threshold
+            ):
+                circuit.state = CIRCUIT_STATE.OPEN
+                circuit.opened_at = time.monotonic()
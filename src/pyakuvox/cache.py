@@ -0,0 +1,138 @@
+# SPDX-License-Identifier: Apache-2.0
+# SPDX-FileCopyrightText: 2025 Andrew Grimberg <tykeal@bardicgrove.org>
+"""Persistent on-disk cache for Akuvox API listings."""
+
+from __future__ import annotations
+from typing import Any, NamedTuple
+import json
+import os
+import sqlite3
+import time
+
+from .const import DEFAULT_CACHE_MAX_AGE
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS listings (
+    namespace TEXT NOT NULL,
+    key TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    PRIMARY KEY (namespace, key)
+)
+"""
+
+
+class CacheEntry(NamedTuple):
+    """A cached API payload and the time it was fetched."""
+
+    payload: Any
+    fetched_at: float
+
+    @property
+    def age(self) -> float:
+        """Return the age of the entry in seconds."""
+        return time.time() - self.fetched_at
+
+
+class DiskCache:
+    """SQLite backed cache for community and device listings.
+
+    Every operation opens its own connection, so a single cache file can be
+    shared by threads and worker processes. The database uses write-ahead
+    logging so readers are not blocked while another process stores a new
+    payload.
+
+    Entries older than ``max_age`` are not served in place of a request;
+    they are only used as a fallback while the API cannot be reached.
+    """
+
+    def __init__(
+        self,
+        path: str | os.PathLike[str],
+        namespace: str = "",
+        max_age: float = DEFAULT_CACHE_MAX_AGE,
+    ) -> None:
+        """Initialize the cache.
+
+        :param path: The path of the SQLite database file.
+        :type path: str | os.PathLike[str]
+        :param namespace: Prefix separating entries of different accounts
+            stored in the same file.
+        :type namespace: str
+        :param max_age: Age in seconds after which an entry must be
+            revalidated with a request before it is served.
+        :type max_age: float
+        """
+        self.path: str = os.fspath(path)
+        self.namespace: str = namespace
+        self.max_age: float = max_age
+        connection = self._connect()
+        try:
+            connection.execute("PRAGMA journal_mode=WAL")
+            with connection:
+                connection.execute(_SCHEMA)
+        finally:
+            connection.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open a connection to the cache database.
+
+        :meta private:
+        """
+        return sqlite3.connect(self.path, timeout=30)
+
+    def with_namespace(self, namespace: str) -> DiskCache:
+        """Return a cache on the same file using another namespace.
+
+        :param namespace: The namespace of the new cache.
+        :type namespace: str
+        :return: The namespaced cache.
+        :rtype: DiskCache
+        """
+        return DiskCache(self.path, namespace, self.max_age)
+
+    def get(self, key: str, fresh: bool = False) -> CacheEntry | None:
+        """Return the cached entry for a key.
+
+        :param key: The cache key.
+        :type key: str
+        :param fresh: Only return the entry if it is not older than
+            ``max_age``.
+        :type fresh: bool
+        :return: The cached entry, or None if nothing is stored or the entry
+            is too old.
+        :rtype: CacheEntry | None
+        """
+        connection = self._connect()
+        try:
+            row = connection.execute(
+                "SELECT payload, fetched_at FROM listings "
+                "WHERE namespace = ? AND key = ?",
+                (self.namespace, key),
+            ).fetchone()
+        finally:
+            connection.close()
+        if row is None:
+            return None
+        if fresh and time.time() - row[1] > self.max_age:
+            return None
+        return CacheEntry(json.loads(row[0]), row[1])
+
+    def set(self, key: str, payload: Any) -> None:
+        """Store a payload for a key, replacing any previous entry.
+
+        :param key: The cache key.
+        :type key: str
+        :param payload: The JSON serializable payload to store.
+        :type payload: Any
+        """
+        connection = self._connect()
+        try:
+            with connection:
+                connection.execute(
+                    "INSERT OR REPLACE INTO listings "
+                    "(namespace, key, payload, fetched_at) VALUES (?, ?, ?, ?)",
+                    (self.namespace, key, json.dumps(payload), time.time()),
+                )
+        finally:
+            connection.close()
@@ -0,0 +1,308 @@
+# SPDX-License-Identifier: Apache-2.0
+# SPDX-FileCopyrightText: 2025 Andrew Grimberg <tykeal@bardicgrove.org>
+"""Command line tool for inspecting communities and devices."""
+
+from __future__ import annotations
+from collections.abc import Callable, Iterable, Sequence
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextvars import copy_context
+from typing import Any, Final, TextIO
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+
+from .api import Akuvox
+from .auth import Auth
+from .communities import Community
+from .const import DEFAULT_CONNECT_TIMEOUT, DEFAULT_READ_TIMEOUT, SUBDOMAINS_LIST
+from .devices import DEVICE_STATUS, DEVICE_TYPE, Device
+from .exceptions import AkuvoxError
+from .table import COLUMNS
+
+ENV_SUBDOMAIN: Final[str] = "PYAKUVOX_SUBDOMAIN"
+ENV_USERNAME: Final[str] = "PYAKUVOX_USERNAME"
+ENV_PASSWORD: Final[str] = "PYAKUVOX_PASSWORD"
+
+COMMUNITY_COLUMNS: Final[tuple[str, ...]] = ("ID", "Location")
+
+DEVICE_TYPES: Final[dict[str, DEVICE_TYPE]] = {
+    member.name.lower().replace("_", "-"): member for member in DEVICE_TYPE
+}
+DEVICE_STATUSES: Final[dict[str, DEVICE_STATUS]] = {
+    member.name.lower(): member for member in DEVICE_STATUS
+}
+
+
+class _Writer:
+    """Write rows as NDJSON or CSV, flushing after every batch.
+
+    :meta private:
+    """
+
+    def __init__(self, stream: TextIO, fmt: str, columns: Sequence[str]) -> None:
+        """Initialize the writer and write the CSV header.
+
+        :param stream: The stream to write to.
+        :type stream: TextIO
+        :param fmt: Either ``ndjson`` or ``csv``.
+        :type fmt: str
+        :param columns: The columns of each row.
+        :type columns: Sequence[str]
+        """
+        self._stream = stream
+        self._columns = columns
+        self._csv = csv.writer(stream) if fmt == "csv" else None
+        if self._csv is not None:
+            self._csv.writerow(columns)
+            stream.flush()
+
+    def write(self, rows: Iterable[dict[str, Any]]) -> None:
+        """Write rows and flush them to the stream.
+
+        :param rows: Rows keyed by column name.
+        :type rows: Iterable[dict[str, Any]]
+        """
+        for row in rows:
+            if self._csv is not None:
+                self._csv.writerow([row[name] for name in self._columns])
+            else:
+                self._stream.write(json.dumps(row) + "\n")
+        self._stream.flush()
+
+
+def _device_row(community_id: str, device: Device) -> dict[str, Any]:
+    """Return a device as an output row.
+
+    :meta private:
+    """
+    row = {name: getattr(device, name) for name in COLUMNS[1:]}
+    row["Type"] = device.Type.name
+    row["Status"] = device.Status.name
+    return {"CommunityID": community_id, **row}
+
+
+def _error(message: str) -> None:
+    """Print an error message to stderr.
+
+    :meta private:
+    """
+    print(f"pyakuvox: error: {message}", file=sys.stderr)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Return the argument parser of the command line tool.
+
+    :return: The argument parser.
+    :rtype: argparse.ArgumentParser
+    """
+    parser = argparse.ArgumentParser(
+        prog="pyakuvox",
+        description="Inspect Akuvox communities and devices.",
+        epilog=(
+            f"Credentials default to the {ENV_SUBDOMAIN}, {ENV_USERNAME} and "
+            f"{ENV_PASSWORD} environment variables."
+        ),
+    )
+    parser.add_argument(
+        "--subdomain",
+        choices=SUBDOMAINS_LIST,
+        default=os.environ.get(ENV_SUBDOMAIN),
+        help="API subdomain of the account",
+    )
+    parser.add_argument("--username", default=os.environ.get(ENV_USERNAME))
+    parser.add_argument("--password", default=os.environ.get(ENV_PASSWORD))
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        help=(
+            "request timeout in seconds (default: "
+            f"{DEFAULT_CONNECT_TIMEOUT} to connect, {DEFAULT_READ_TIMEOUT} to read)"
+        ),
+    )
+    parser.add_argument(
+        "--format",
+        choices=("ndjson", "csv"),
+        default="ndjson",
+        help="output format (default: ndjson)",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    commands.add_parser("communities", help="list communities")
+
+    devices = commands.add_parser("devices", help="list devices")
+    devices.add_argument(
+        "--community",
+        action="append",
+        metavar="ID",
+        help="community to list, may be repeated (default: all communities)",
+    )
+    devices.add_argument("--type", choices=DEVICE_TYPES, help="only this type")
+    devices.add_argument("--status", choices=DEVICE_STATUSES, help="only this status")
+    devices.add_argument(
+        "--workers",
+        type=int,
+        default=8,
+        help="communities fetched concurrently (default: 8)",
+    )
+    devices.add_argument(
+        "--watch",
+        action="store_true",
+        help="keep polling and print devices whose status changed",
+    )
+    devices.add_argument(
+        "--interval",
+        type=float,
+        default=60.0,
+        help="seconds between polls in watch mode (default: 60)",
+    )
+    return parser
+
+
+def _communities(akuvox: Akuvox, ids: list[str] | None) -> list[Community]:
+    """Return the requested communities, listing them if none are given.
+
+    :meta private:
+    """
+    if ids:
+        return [akuvox.community(cid) for cid in ids]
+    return akuvox.communities.get_communities()
+
+
+def _fetch_all(
+    communities: list[Community],
+    fetch: Callable[[Community], list[Device]],
+    workers: int,
+    emit: Callable[[str, list[Device]], None],
+) -> bool:
+    """Fetch devices of all communities concurrently.
+
+    ``emit`` is called in the calling thread as each community completes,
+    so output streams while slower communities are still being fetched.
+
+    :return: True if every community was fetched.
+
+    :meta private:
+    """
+    ok = True
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(communities)))) as ex:
+        futures = {
+            ex.submit(copy_context().run, fetch, community): str(community.ID)
+            for community in communities
+        }
+        for future in as_completed(futures):
+            community_id = futures[future]
+            try:
+                devices = future.result()
+            except AkuvoxError as e:
+                _error(f"community {community_id}: {e}")
+                ok = False
+                continue
+            emit(community_id, devices)
+    return ok
+
+
+def _devices(
+    akuvox: Akuvox,
+    args: argparse.Namespace,
+    writer: _Writer,
+    sleep: Callable[[float], None],
+) -> int:
+    """Run the devices command.
+
+    :meta private:
+    """
+    device_type = DEVICE_TYPES[args.type] if args.type else None
+    status = DEVICE_STATUSES[args.status] if args.status else None
+    communities = _communities(akuvox, args.community)
+    # Log in once up front instead of racing in every worker
+    akuvox.auth.ensure_authenticated()
+
+    seen: dict[tuple[str, str], DEVICE_STATUS] = {}
+    refresh = False
+
+    def fetch(community: Community) -> list[Device]:
+        """Return the devices of ``community`` to report on."""
+        if not args.watch:
+            return community.query(device_type, status)
+        # Changes are detected on the whole list, so a device leaving or
+        # entering the requested status is noticed
+        return community.load_devices(refresh)
+
+    def wanted(device: Device) -> bool:
+        """Return whether ``device`` matches the requested filters."""
+        return (device_type is None or device.Type == device_type) and (
+            status is None or device.Status == status
+        )
+
+    def emit(community_id: str, devices: list[Device]) -> None:
+        """Write the wanted devices whose status changed."""
+        changed = []
+        for device in devices:
+            key = (community_id, device.ID)
+            if seen.get(key) != device.Status:
+                seen[key] = device.Status
+                if wanted(device):
+                    changed.append(_device_row(community_id, device))
+        writer.write(changed)
+
+    ok = _fetch_all(communities, fetch, args.workers, emit)
+    if not args.watch:
+        return 0 if ok else 1
+
+    refresh = True
+    try:
+        while True:
+            sleep(args.interval)
+            _fetch_all(communities, fetch, args.workers, emit)
+    except KeyboardInterrupt:
+        return 0
+
+
+def main(
+    argv: Sequence[str] | None = None,
+    stdout: TextIO | None = None,
+    sleep: Callable[[float], None] = time.sleep,
+) -> int:
+    """Run the command line tool.
+
+    :param argv: The arguments, defaulting to ``sys.argv[1:]``.
+    :type argv: Sequence[str] | None
+    :param stdout: The stream to write results to, defaulting to stdout.
+    :type stdout: TextIO | None
+    :param sleep: Function waiting between polls in watch mode.
+    :type sleep: Callable[[float], None]
+    :return: The exit status.
+    :rtype: int
+    """
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    missing = [
+        name
+        for name in ("subdomain", "username", "password")
+        if not getattr(args, name)
+    ]
+    if missing:
+        parser.error(f"missing credentials: {', '.join(missing)}")
+
+    auth_kwargs: dict[str, Any] = {}
+    if args.timeout is not None:
+        auth_kwargs["timeout"] = args.timeout
+    akuvox = Akuvox(Auth(args.subdomain, args.username, args.password, **auth_kwargs))
+    stream = stdout if stdout is not None else sys.stdout
+
+    try:
+        if args.command == "communities":
+            writer = _Writer(stream, args.format, COMMUNITY_COLUMNS)
+            writer.write(
+                {"ID": c.ID, "Location": c.Location}
+                for c in akuvox.communities.get_communities()
+            )
+            return 0
+        writer = _Writer(stream, args.format, COLUMNS)
+        return _devices(akuvox, args, writer, sleep)
+    except AkuvoxError as e:
+        _error(str(e))
+        return 1
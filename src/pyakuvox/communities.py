@@ -6,24 +6,48 @@ from __future__ import annotations
 from typing import Any
 
 from .auth import Auth
-from .devices import Device, Devices
+from .cache import DiskCache
+from .deadline import within
+from .devices import DEVICE_STATUS, DEVICE_TYPE, Device, Devices
+from .events import EVENT_TYPE, Event, EventBus, fingerprint
+from .exceptions import AkuvoxError, DeadlineExceededError, NotAuthenticatedError
+from .profiling import PROFILER, SECTION_BUILD, profiled
+from .strings import StringPool
+
+COMMUNITIES_CACHE_KEY = "communities"
 
 
 class Community:
     """Represents a single community."""
 
-    def __init__(self, data: dict[str, Any], auth: Auth) -> None:
+    def __init__(
+        self,
+        data: dict[str, Any],
+        auth: Auth,
+        cache: DiskCache | None = None,
+        soft_ttl: float | None = None,
+        events: EventBus | None = None,
+        pool: StringPool | None = None,
+    ) -> None:
         """Initialize the Community instance.
 
         :param data: The community data dictionary.
         :type data: dict
         :param auth: An instance of the Auth class for authentication.
         :type auth: Auth
+        :param cache: Optional on-disk cache for the device listing.
+        :type cache: DiskCache | None
+        :param soft_ttl: Optional soft TTL for background device refreshes.
+        :type soft_ttl: float | None
+        :param events: Optional event bus notified of device list changes.
+        :type events: EventBus | None
+        :param pool: Optional pool deduplicating strings of the devices.
+        :type pool: StringPool | None
         """
         self.ID = data.get("ID", "")
         self.Location = data.get("Location", "")
         self._auth = auth
-        self._devices = Devices(self.ID, self._auth)
+        self._devices = Devices(self.ID, self._auth, cache, soft_ttl, events, pool)
 
     @property
     def devices(self) -> list[Device]:
@@ -34,25 +58,167 @@ class Community:
         """
         return self._devices.devices
 
+    def load_devices(
+        self, refresh: bool = False, deadline: float | None = None
+    ) -> list[Device]:
+        """Return the devices in this community, waiting for them to load.
+
+        Unlike :attr:`devices` this never returns a list that is still being
+        fetched in the background.
+
+        :param refresh: Fetch the devices even if they are already loaded.
+        :type refresh: bool
+        :param deadline: Optional time budget in seconds for the listing.
+        :type deadline: float | None
+        :return: A list of Device instances.
+        :rtype: list[Device]
+        """
+        return self._devices.load(refresh, deadline)
+
+    def query(
+        self,
+        device_type: DEVICE_TYPE | None = None,
+        status: DEVICE_STATUS | None = None,
+        unit_name: str | None = None,
+        search: str | None = None,
+        deadline: float | None = None,
+    ) -> list[Device]:
+        """Return devices in this community matching all of the given filters.
+
+        See :meth:`Devices.query` for how the filters are applied.
+
+        :param device_type: Only return devices of this type.
+        :type device_type: DEVICE_TYPE | None
+        :param status: Only return devices with this status.
+        :type status: DEVICE_STATUS | None
+        :param unit_name: Only return devices in this unit.
+        :type unit_name: str | None
+        :param search: Only return devices with this text, ignoring case, in
+            their name, MAC, location, unit or room.
+        :type search: str | None
+        :param deadline: Optional time budget in seconds for the request.
+        :type deadline: float | None
+        :return: A list of matching Device instances.
+        :rtype: list[Device]
+        """
+        return self._devices.query(device_type, status, unit_name, search, deadline)
+
 
 class Communities:
     """Communities management for the Akuvox system."""
 
-    def __init__(self, auth: Auth) -> None:
+    def __init__(
+        self,
+        auth: Auth,
+        cache: DiskCache | None = None,
+        soft_ttl: float | None = None,
+        events: EventBus | None = None,
+        pool: StringPool | None = None,
+    ) -> None:
         """Initialize the Communities manager.
 
         :param auth: An instance of the Auth class for authentication.
         :type auth: Auth
+        :param cache: Optional on-disk cache for community and device
+            listings.
+        :type cache: DiskCache | None
+        :param soft_ttl: Optional soft TTL for background device refreshes.
+        :type soft_ttl: float | None
+        :param events: Optional event bus notified of listing changes.
+        :type events: EventBus | None
+        :param pool: Optional pool deduplicating strings of the devices.
+        :type pool: StringPool | None
         """
         self._auth = auth
+        self._cache = cache
+        self._soft_ttl = soft_ttl
+        self._events = events
+        self._pool = pool
+        self._fingerprint: int | None = None
+        self._loaded: bool = False
 
-    def get_communities(self) -> list[Community]:
+    def _build(self, data: list[dict[str, Any]]) -> list[Community]:
+        """Build Community instances from listing data.
+
+        :meta private:
+        """
+        with PROFILER.section(SECTION_BUILD):
+            return [
+                Community(
+                    item,
+                    self._auth,
+                    self._cache,
+                    self._soft_ttl,
+                    self._events,
+                    self._pool,
+                )
+                for item in data
+            ]
+
+    @profiled("Communities.get_communities")
+    def get_communities(self, deadline: float | None = None) -> list[Community]:
         """Retrieve a list of communities.
 
+        When a cache is configured, the first call serves a listing stored
+        less than the cache's ``max_age`` ago without a request. Listings
+        are stored on success, and the last stored listing is returned if
+        the API cannot be reached. Login failures and exceeded deadlines are
+        raised instead.
+
+        :param deadline: Optional time budget in seconds for the listing.
+        :type deadline: float | None
         :return: A list of communities.
         :rtype: list[Community]
+        :raises NotAuthenticatedError: If the login fails.
+        :raises DeadlineExceededError: If the deadline is exceeded.
+        :raises AkuvoxError: If the request fails and nothing is cached.
         """
+        if not self._loaded and self._cache is not None:
+            entry = self._cache.get(COMMUNITIES_CACHE_KEY, fresh=True)
+            if entry is not None:
+                return self._load(entry.payload)
         path = "/property/comunityinfo"
-        response = self._auth.requests("GET", path)
+        try:
+            with within(deadline):
+                response = self._auth.requests("GET", path)
+        except (NotAuthenticatedError, DeadlineExceededError):
+            raise
+        except AkuvoxError:
+            cached = self.cached_communities()
+            if cached is None:
+                raise
+            return cached
         data = response.get("data", [])
-        return [Community(item, self._auth) for item in data]
+        if self._cache is not None:
+            self._cache.set(COMMUNITIES_CACHE_KEY, data)
+        return self._load(data)
+
+    def _load(self, data: list[dict[str, Any]]) -> list[Community]:
+        """Build the communities of a listing and publish any change.
+
+        :meta private:
+        """
+        self._loaded = True
+        communities = self._build(data)
+        if self._events is not None and self._events.has_subscribers:
+            digest = fingerprint(data)
+            if digest != self._fingerprint:
+                self._fingerprint = digest
+                self._events.emit(Event(EVENT_TYPE.COMMUNITIES_CHANGED, communities))
+        return communities
+
+    def cached_communities(self) -> list[Community] | None:
+        """Return the communities stored in the cache without a request.
+
+        This lets a restarted service render from the last known listing
+        while :meth:`get_communities` revalidates it.
+
+        :return: The cached communities, or None if nothing is cached.
+        :rtype: list[Community] | None
+        """
+        if self._cache is None:
+            return None
+        entry = self._cache.get(COMMUNITIES_CACHE_KEY)
+        if entry is None:
+            return None
+        return self._build(entry.payload)
@@ -8,6 +8,12 @@ from typing import Final
 BASE_DOMAIN: Final[str] = "akuvox.com"
 
 DEFAULT_TIMEOUT: Final[int] = 60
+DEFAULT_CONNECT_TIMEOUT: Final[int] = 10
+DEFAULT_READ_TIMEOUT: Final[int] = DEFAULT_TIMEOUT
+
+DEFAULT_STRING_POOL_SIZE: Final[int] = 65536
+
+DEFAULT_CACHE_MAX_AGE: Final[int] = 900
 
 SUBDOMAIN_AMERICA: Final[str] = "ucloud"
 SUBDOMAIN_ASIA: Final[str] = "scloud"
@@ -0,0 +1,128 @@
+# SPDX-License-Identifier: Apache-2.0
+# SPDX-FileCopyrightText: 2025 Andrew Grimberg <tykeal@bardicgrove.org>
+"""Deadlines bounding the total time spent on an operation."""
+
+from __future__ import annotations
+from collections.abc import Iterator
+from contextlib import AbstractContextManager, contextmanager, nullcontext
+from contextvars import ContextVar, Token
+from types import TracebackType
+from typing import Final
+import threading
+import time
+
+from .exceptions import DeadlineExceededError
+
+Timeout = float | tuple[float, float]
+
+_CURRENT: Final[ContextVar[Deadline | None]] = ContextVar(
+    "pyakuvox_deadline", default=None
+)
+
+
+class Deadline:
+    """A point in time by which an operation must finish.
+
+    Used as a context manager, a deadline applies to every request made
+    inside the block, including logins and the requests of composite calls.
+    Request timeouts are shortened to the remaining time and a request that
+    would start after the deadline raises :class:`DeadlineExceededError`.
+    Nested deadlines never extend an enclosing one.
+
+    .. code-block:: python
+
+        with Deadline(5.0):
+            communities = akuvox.communities.get_communities()
+            table = DeviceTable.from_communities(communities)
+    """
+
+    def __init__(self, seconds: float) -> None:
+        """Initialize a deadline the given number of seconds from now.
+
+        :param seconds: The time budget in seconds.
+        :type seconds: float
+        """
+        self.expires_at: float = time.monotonic() + seconds
+        self._token: Token[Deadline | None] | None = None
+
+    @staticmethod
+    def current() -> Deadline | None:
+        """Return the deadline in effect for the current context."""
+        return _CURRENT.get()
+
+    def remaining(self) -> float:
+        """Return the number of seconds left, never less than zero."""
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        """Check if the deadline has passed."""
+        return self.remaining() <= 0
+
+    def clamp(self, timeout: Timeout) -> tuple[float, float]:
+        """Shorten a request timeout to the time remaining.
+
+        :param timeout: A single timeout or a (connect, read) pair.
+        :type timeout: float | tuple[float, float]
+        :return: The (connect, read) timeouts to use.
+        :rtype: tuple[float, float]
+        :raises DeadlineExceededError: If the deadline has passed.
+        """
+        remaining = self.remaining()
+        if remaining <= 0:
+            raise DeadlineExceededError()
+        connect, read = timeout if isinstance(timeout, tuple) else (timeout, timeout)
+        return min(connect, remaining), min(read, remaining)
+
+    def __enter__(self) -> Deadline:
+        """Make this deadline the current one for the block."""
+        outer = _CURRENT.get()
+        if outer is not None and outer.expires_at < self.expires_at:
+            self.expires_at = outer.expires_at
+        self._token = _CURRENT.set(self)
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        """Restore the previous deadline."""
+        if self._token is not None:
+            _CURRENT.reset(self._token)
+            self._token = None
+
+
+def within(seconds: float | None) -> AbstractContextManager[Deadline | None]:
+    """Return a context manager applying an optional deadline.
+
+    :param seconds: The time budget in seconds, or None for no new deadline.
+    :type seconds: float | None
+    :return: A context manager.
+
+    :meta private:
+    """
+    if seconds is None:
+        return nullcontext()
+    return Deadline(seconds)
+
+
+@contextmanager
+def acquire(lock: threading.Lock | threading.RLock) -> Iterator[None]:
+    """Hold a lock, waiting for it no longer than the current deadline.
+
+    :param lock: The lock to hold.
+    :type lock: threading.Lock | threading.RLock
+    :raises DeadlineExceededError: If the deadline passes while waiting.
+
+    :meta private:
+    """
+    deadline = Deadline.current()
+    timeout = -1 if deadline is None else deadline.remaining()
+    if not lock.acquire(timeout=timeout):
+        raise DeadlineExceededError("Deadline exceeded waiting for a lock.")
+    try:
+        yield
+    finally:
+        lock.release()
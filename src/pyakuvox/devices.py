@@ -5,8 +5,23 @@
 from __future__ import annotations
 
 from enum import StrEnum
+from typing import Any, Final
+import threading
+import time
 
+from . import _forksafe
 from .auth import Auth
+from .cache import DiskCache
+from .deadline import acquire, within
+from .events import EVENT_TYPE, Event, EventBus, fingerprint
+from .exceptions import (
+    AkuvoxError,
+    CircuitOpenError,
+    DeadlineExceededError,
+    NotAuthenticatedError,
+)
+from .profiling import PROFILER, SECTION_BUILD, profiled
+from .strings import StringPool
 
 
 class DEVICE_STATUS(StrEnum):
@@ -24,76 +39,459 @@ class DEVICE_TYPE(StrEnum):
     INDOOR_MONITOR = "2"
 
 
+# Query parameters accepted by /property/selectdevice for each filter. Only
+# exact match filters are sent: whether a response honoured them can be told
+# from the devices it returns, which is not true of a free text search.
+FILTER_PARAMS: Final[dict[str, str]] = {
+    "Type": "Type",
+    "Status": "Status",
+    "UnitName": "UnitName",
+}
+
+# Device fields matched by a free text search
+SEARCH_FIELDS: Final[tuple[str, ...]] = (
+    "Name",
+    "MAC",
+    "Location",
+    "UnitName",
+    "RoomName",
+)
+
+
+def _matches(device: Device, criteria: dict[str, str]) -> bool:
+    """Check if a device matches all filter criteria.
+
+    :meta private:
+    """
+    for field, value in criteria.items():
+        if field == "search":
+            needle = value.casefold()
+            if not any(
+                needle in getattr(device, name).casefold() for name in SEARCH_FIELDS
+            ):
+                return False
+        elif getattr(device, field) != value:
+            return False
+    return True
+
+
+def _unchanged(value: str) -> str:
+    """Return a value as is, used when no string pool is configured.
+
+    :meta private:
+    """
+    return value
+
+
 class Device:
     """Represents a single device."""
 
-    def __init__(self, data: dict) -> None:
+    def __init__(self, data: dict, pool: StringPool | None = None) -> None:
         """Initialize the Device instance.
 
         :param data: The device data dictionary.
         :type data: dict
+        :param pool: Optional pool deduplicating the strings that repeat
+            across devices, such as unit, room, location and firmware.
+        :type pool: StringPool | None
         """
+        intern = pool.intern if pool is not None else _unchanged
         self.ID: str = str(data.get("ID", ""))
-        self.Relay: str = str(data.get("Relay", ""))
-        self.Location: str = data.get("Location", "")
+        self.Relay: str = intern(str(data.get("Relay", "")))
+        self.Location: str = intern(data.get("Location", ""))
         self.MAC: str = data.get("MAC", "")
         self.Type: DEVICE_TYPE = DEVICE_TYPE(data.get("Type", "0"))
         self.Status: DEVICE_STATUS = DEVICE_STATUS(data.get("Status", "0"))
-        self.UnitName: str = data.get("UnitName", "")
-        self.RoomName: str = data.get("RoomName", "")
+        self.UnitName: str = intern(data.get("UnitName", ""))
+        self.RoomName: str = intern(data.get("RoomName", ""))
         self.Name: str = data.get("Name", "")
-        self.VersionNumber: str = data.get("VersionNumber", "")
+        self.VersionNumber: str = intern(data.get("VersionNumber", ""))
 
 
 class Devices:
     """Devices management for the Akuvox system."""
 
-    def __init__(self, community_id: str, auth: Auth) -> None:
+    def __init__(
+        self,
+        community_id: str,
+        auth: Auth,
+        cache: DiskCache | None = None,
+        soft_ttl: float | None = None,
+        events: EventBus | None = None,
+        pool: StringPool | None = None,
+    ) -> None:
         """Initialize the Devices manager.
 
         :param community_id: The ID of the community to manage devices for.
         :type community_id: str
         :param auth: An instance of the Auth class for authentication.
         :type auth: Auth
+        :param cache: Optional on-disk cache for the device listing.
+        :type cache: DiskCache | None
+        :param soft_ttl: Optional age in seconds after which reads trigger a
+            background refresh instead of blocking on a request.
+        :type soft_ttl: float | None
+        :param events: Optional event bus notified when the list changes.
+        :type events: EventBus | None
+        :param pool: Optional pool deduplicating strings of the devices.
+        :type pool: StringPool | None
         """
         self._auth = auth
         self._community_id: str = community_id
+        self._cache = cache
+        self._soft_ttl = soft_ttl
+        self._events = events
+        self._pool = pool
+        self._fingerprint: int | None = None
         self._devices: list[Device] = []
+        self._checked_at: float | None = None
+        self._refresh_error: Exception | None = None
+        self._server_filters: bool | None = None
+        self._reset_locks()
+        _forksafe.track(self)
+
+    def _reset_locks(self) -> None:
+        """Create the locks and forget any refresh thread.
+
+        :meta private:
+        """
+        self._load_lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._refresh_thread: threading.Thread | None = None
+
+    def __getstate__(self) -> dict[str, Any]:
+        """Return the state to pickle, including devices but no locks."""
+        state = self.__dict__.copy()
+        for key in ("_load_lock", "_refresh_lock", "_refresh_thread"):
+            del state[key]
+        return state
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        """Restore pickled Devices without fetching them again."""
+        self.__dict__.update(state)
+        self._reset_locks()
+        _forksafe.track(self)
+
+    @property
+    def _cache_key(self) -> str:
+        """Return the cache key of this community's device listing.
+
+        :meta private:
+        """
+        return f"devices/{self._community_id}"
 
     @property
     def devices(self) -> list[Device]:
-        """Return the list of devices."""
-        if not self._devices:
-            self.get_devices()
-        return self._devices
+        """Return the list of devices.
 
-    def get_devices(self) -> None:
-        """Retrieve the list of devices in the community.
+        When nothing has been loaded yet, a listing stored in the cache less
+        than the cache's ``max_age`` ago is served without a request;
+        otherwise the devices are fetched. Threads reading at the same time
+        share a single fetch.
+
+        With a ``soft_ttl`` the current list is always returned immediately,
+        even if it is still empty, and a background refresh is started once
+        it is older than the soft TTL. A cached listing of any age is served
+        then, since it is revalidated in the background.
+        """
+        if self._soft_ttl is not None:
+            if self._checked_at is None:
+                self.load_cached()
+            devices = self._devices
+            if self.is_stale:
+                self.refresh()
+            return devices
+        return self.load()
+
+    def load(
+        self, refresh: bool = False, deadline: float | None = None
+    ) -> list[Device]:
+        """Return the list of devices, waiting for it to be loaded.
+
+        Unlike :attr:`devices` this blocks until a list is loaded even with
+        a ``soft_ttl``. A listing stored in the cache less than the cache's
+        ``max_age`` ago is served without a request; otherwise the devices
+        are fetched. Threads loading at the same time share a single fetch.
 
+        :param refresh: Fetch the devices even if they are already loaded.
+        :type refresh: bool
+        :param deadline: Optional time budget in seconds for the listing.
+        :type deadline: float | None
         :return: A list of Device instances.
         :rtype: list[Device]
         """
+        with within(deadline):
+            if refresh:
+                self.get_devices()
+            elif self._checked_at is None:
+                with acquire(self._load_lock):
+                    # Another thread may have loaded the list while we waited
+                    if self._checked_at is None and not self.load_cached(fresh=True):
+                        self.get_devices()
+        return self._devices
+
+    @property
+    def is_stale(self) -> bool:
+        """Check if the list is older than the soft TTL.
+
+        A list that was never loaded is always stale. Failed refreshes count
+        as checks so a failing API is not retried on every read.
+
+        :return: True if a refresh is due, False otherwise.
+        :rtype: bool
+        """
+        if self._checked_at is None:
+            return True
+        if self._soft_ttl is None:
+            return False
+        return time.monotonic() - self._checked_at >= self._soft_ttl
+
+    @property
+    def refresh_error(self) -> Exception | None:
+        """Return the error of the last background refresh, if it failed."""
+        return self._refresh_error
+
+    @property
+    def is_refreshing(self) -> bool:
+        """Check if a background refresh is running."""
+        thread = self._refresh_thread
+        return thread is not None and thread.is_alive()
+
+    def _load_rows(self, rows: list[dict[str, Any]], age: float = 0.0) -> None:
+        """Replace the device list with devices built from API rows.
+
+        The list is built first and swapped in with a single assignment, so
+        readers see either the old or the new list, never a partial one.
+
+        :meta private:
+        """
+        with PROFILER.section(SECTION_BUILD):
+            self._devices = [Device(item, self._pool) for item in rows]
+        self._checked_at = time.monotonic() - age
+        if self._events is not None and self._events.has_subscribers:
+            digest = fingerprint(rows)
+            if digest != self._fingerprint:
+                self._fingerprint = digest
+                self._events.emit(
+                    Event(
+                        EVENT_TYPE.DEVICES_CHANGED,
+                        self._devices,
+                        str(self._community_id),
+                    )
+                )
+
+    def _fetch_rows(self, params: dict[str, str] | None = None) -> list[dict[str, Any]]:
+        """Request the device listing and store it in the cache.
+
+        Filtered listings are not cached.
+
+        :meta private:
+        """
         path = "/property/selectdevice"
         headers = {"x-community-id": str(self._community_id)}
-        response = self._auth.requests("GET", path, headers=headers)
-        data = response.get("data", {})
-        if "row" in data:
-            data = data["row"]
-            self._devices = [Device(item) for item in data]
+        if params:
+            response = self._auth.requests("GET", path, headers=headers, params=params)
         else:
-            self._devices = []
+            response = self._auth.requests("GET", path, headers=headers)
+        data = response.get("data", {})
+        rows = data["row"] if "row" in data else []
+        if self._cache is not None and not params:
+            self._cache.set(self._cache_key, rows)
+        return rows
+
+    @profiled("Devices.get_devices")
+    def get_devices(self, deadline: float | None = None) -> None:
+        """Retrieve the list of devices in the community.
+
+        When a cache is configured the listing is stored on success, and the
+        last stored listing is loaded if the API cannot be reached. Login
+        failures and exceeded deadlines are raised instead.
+
+        :param deadline: Optional time budget in seconds for the listing.
+        :type deadline: float | None
+        :raises NotAuthenticatedError: If the login fails.
+        :raises DeadlineExceededError: If the deadline is exceeded.
+        :raises AkuvoxError: If the request fails and nothing is cached.
+        """
+        try:
+            with within(deadline):
+                rows = self._fetch_rows()
+        except (NotAuthenticatedError, DeadlineExceededError):
+            raise
+        except AkuvoxError:
+            if not self.load_cached():
+                raise
+            return
+        self._load_rows(rows)
+
+    def load_cached(self, fresh: bool = False) -> bool:
+        """Load the device listing stored in the cache.
+
+        :param fresh: Only load the listing if it is not older than the
+            cache's ``max_age``.
+        :type fresh: bool
+        :return: True if a cached listing was loaded, False otherwise.
+        :rtype: bool
+        """
+        if self._cache is None:
+            return False
+        entry = self._cache.get(self._cache_key, fresh)
+        if entry is None:
+            return False
+        self._load_rows(entry.payload, entry.age)
+        return True
+
+    def refresh(self) -> None:
+        """Start a background refresh of the device list.
+
+        Calls made while a refresh is already running share it. Errors are
+        kept in :attr:`refresh_error` and the current list stays in place.
+        """
+        with self._refresh_lock:
+            if self.is_refreshing:
+                return
+            self._refresh_thread = threading.Thread(
+                target=self._background_refresh,
+                name=f"pyakuvox-devices-{self._community_id}",
+                daemon=True,
+            )
+            self._refresh_thread.start()
+
+    def wait_for_refresh(self, timeout: float | None = None) -> bool:
+        """Wait for a running background refresh to finish.
+
+        :param timeout: Maximum number of seconds to wait.
+        :type timeout: float | None
+        :return: True if no refresh is running anymore, False on timeout.
+        :rtype: bool
+        """
+        thread = self._refresh_thread
+        if thread is not None:
+            thread.join(timeout)
+        return not self.is_refreshing
+
+    @profiled("Devices.refresh")
+    def _background_refresh(self) -> None:
+        """Refresh the device list, recording any error.
+
+        :meta private:
+        """
+        try:
+            self._load_rows(self._fetch_rows())
+        except Exception as e:
+            # The thread has no caller to raise to, so anything that goes
+            # wrong, such as an unknown device type, is recorded instead
+            self._refresh_error = e
+            self._checked_at = time.monotonic()
+            return
+        self._refresh_error = None
+
+    @property
+    def server_filters(self) -> bool | None:
+        """Check if the API filters device listings for us.
+
+        :return: True if supported, False if not, None if not probed yet.
+        :rtype: bool | None
+        """
+        return self._server_filters
+
+    @profiled("Devices.query")
+    def query(
+        self,
+        device_type: DEVICE_TYPE | None = None,
+        status: DEVICE_STATUS | None = None,
+        unit_name: str | None = None,
+        search: str | None = None,
+        deadline: float | None = None,
+    ) -> list[Device]:
+        """Return devices matching all of the given filters.
+
+        Once the device list is loaded it is filtered locally. Otherwise the
+        type, status and unit filters are passed to the API as query
+        parameters so only matching devices are transferred, and the result
+        is not kept. The first such request returning devices probes whether
+        the API honours them: if it returns devices that do not match, or
+        rejects the filters with an error, server side filtering is switched
+        off for this community and the list is loaded and filtered locally
+        from then on. A search is always applied locally.
+
+        :param device_type: Only return devices of this type.
+        :type device_type: DEVICE_TYPE | None
+        :param status: Only return devices with this status.
+        :type status: DEVICE_STATUS | None
+        :param unit_name: Only return devices in this unit.
+        :type unit_name: str | None
+        :param search: Only return devices with this text, ignoring case, in
+            their name, MAC, location, unit or room.
+        :type search: str | None
+        :param deadline: Optional time budget in seconds for the request.
+        :type deadline: float | None
+        :return: A list of matching Device instances.
+        :rtype: list[Device]
+        """
+        criteria = {
+            field: value
+            for field, value in (
+                ("Type", device_type),
+                ("Status", status),
+                ("UnitName", unit_name),
+                ("search", search),
+            )
+            if value is not None
+        }
+        exact = {
+            field: value for field, value in criteria.items() if field in FILTER_PARAMS
+        }
+        with within(deadline):
+            devices = None
+            if exact and self._checked_at is None and self._server_filters is not False:
+                devices = self._server_query(exact)
+            if devices is None:
+                devices = self.devices
+        return [d for d in devices if _matches(d, criteria)]
+
+    def _server_query(self, exact: dict[str, str]) -> list[Device] | None:
+        """Request devices filtered by the API, probing if it honours filters.
+
+        :return: The devices returned, or None if the API rejected the
+            filters and the list must be filtered locally.
+
+        :meta private:
+        """
+        params = {FILTER_PARAMS[field]: str(value) for field, value in exact.items()}
+        try:
+            rows = self._fetch_rows(params)
+        except (NotAuthenticatedError, DeadlineExceededError, CircuitOpenError):
+            raise
+        except AkuvoxError:
+            if self._server_filters is not None:
+                raise
+            self._server_filters = False
+            return None
+        with PROFILER.section(SECTION_BUILD):
+            devices = [Device(item, self._pool) for item in rows]
+        # An empty result proves nothing, so the probe waits for devices
+        if self._server_filters is None and devices:
+            self._server_filters = all(_matches(d, exact) for d in devices)
+            if not self._server_filters and len(exact) == 1:
+                # The only filter was ignored, so this is the full listing
+                if self._cache is not None:
+                    self._cache.set(self._cache_key, rows)
+                self._load_rows(rows)
+        return devices
 
     def get_devices_by_type(self, device_type: DEVICE_TYPE) -> list[Device]:
         """Return devices filtered by type.
 
+        The device list is loaded once and filtered locally, so reading
+        several types does not send a request for each.
+
         :param device_type: The device type to filter by.
         :type device_type: DEVICE_TYPE
         :return: A list of Device instances of the specified type.
         :rtype: list[Device]
         """
-        if not self._devices:
-            self.get_devices()
-        return [device for device in self._devices if device.Type == device_type]
+        return [device for device in self.devices if device.Type == device_type]
 
     @property
     def door_phones(self) -> list[Device]:
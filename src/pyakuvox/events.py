@@ -0,0 +1,203 @@
+# SPDX-License-Identifier: Apache-2.0
+# SPDX-FileCopyrightText: 2025 Andrew Grimberg <tykeal@bardicgrove.org>
+"""In-process event bus for authentication and data refreshes."""
+
+from __future__ import annotations
+from collections.abc import Callable
+from enum import StrEnum
+from typing import Any, NamedTuple
+import asyncio
+import json
+import logging
+import threading
+
+from . import _forksafe
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class EVENT_TYPE(StrEnum):
+    """Event type enumeration."""
+
+    AUTHENTICATED = "authenticated"
+    COMMUNITIES_CHANGED = "communities_changed"
+    DEVICES_CHANGED = "devices_changed"
+
+
+class Event(NamedTuple):
+    """An event published on the bus.
+
+    ``data`` is the new community or device list for change events and the
+    Auth instance for ``AUTHENTICATED``. ``community_id`` is set for device
+    changes.
+    """
+
+    type: EVENT_TYPE
+    data: Any
+    community_id: str | None = None
+
+
+Callback = Callable[[Event], None]
+
+
+def fingerprint(rows: Any) -> int:
+    """Return a fingerprint of an API payload to detect changes.
+
+    :param rows: The JSON serializable payload.
+    :type rows: Any
+    :return: A hash of the payload's canonical JSON encoding.
+    :rtype: int
+
+    :meta private:
+    """
+    return hash(json.dumps(rows, sort_keys=True, default=str))
+
+
+class EventStream:
+    """Asynchronous iterator over the events published on a bus.
+
+    Events are queued from the moment the stream is created, including
+    events published from other threads, until it is closed. Closing the
+    stream ends the iteration once the events queued before are consumed.
+    """
+
+    def __init__(self, bus: EventBus, event_type: EVENT_TYPE | None = None) -> None:
+        """Initialize the stream on the running event loop.
+
+        :param bus: The bus to receive events from.
+        :type bus: EventBus
+        :param event_type: Only receive events of this type.
+        :type event_type: EVENT_TYPE | None
+        :raises RuntimeError: If no event loop is running.
+        """
+        self._loop = asyncio.get_running_loop()
+        # None marks the end of the stream
+        self._queue: asyncio.Queue[Event | None] = asyncio.Queue()
+        self._closed = False
+        self._unsubscribe = bus.subscribe(self._put, event_type)
+
+    def _put(self, event: Event) -> None:
+        """Queue an event from any thread.
+
+        :meta private:
+        """
+        self._loop.call_soon_threadsafe(self._queue.put_nowait, event)
+
+    def close(self) -> None:
+        """Stop receiving events and end the iteration.
+
+        May be called from any thread.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        self._unsubscribe()
+        if not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._queue.put_nowait, None)
+
+    def __aiter__(self) -> EventStream:
+        """Return the stream itself."""
+        return self
+
+    async def __anext__(self) -> Event:
+        """Wait for the next event.
+
+        :raises StopAsyncIteration: When the stream was closed.
+        """
+        event = await self._queue.get()
+        if event is None:
+            # Let later calls end as well
+            self._queue.put_nowait(None)
+            raise StopAsyncIteration
+        return event
+
+    def __enter__(self) -> EventStream:
+        """Return the stream for use in a with block."""
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        """Close the stream."""
+        self.close()
+
+
+class EventBus:
+    """Publish and subscribe hub for client events.
+
+    Callbacks run synchronously in the thread that produced the event. An
+    exception raised by a callback is logged and does not affect the
+    operation that published the event or other subscribers.
+    """
+
+    def __init__(self) -> None:
+        """Initialize a bus without subscribers."""
+        self._subscribers: list[tuple[Callback, EVENT_TYPE | None]] = []
+        self._reset_locks()
+        _forksafe.track(self)
+
+    def _reset_locks(self) -> None:
+        """Create the lock guarding the subscriber list.
+
+        :meta private:
+        """
+        self._lock = threading.Lock()
+
+    @property
+    def has_subscribers(self) -> bool:
+        """Check if anything is subscribed to the bus."""
+        return bool(self._subscribers)
+
+    def subscribe(
+        self, callback: Callback, event_type: EVENT_TYPE | None = None
+    ) -> Callable[[], None]:
+        """Register a callback.
+
+        :param callback: Called with each matching event.
+        :type callback: Callable[[Event], None]
+        :param event_type: Only deliver events of this type.
+        :type event_type: EVENT_TYPE | None
+        :return: A function removing the subscription.
+        :rtype: Callable[[], None]
+        """
+        subscription = (callback, event_type)
+        with self._lock:
+            self._subscribers.append(subscription)
+
+        def unsubscribe() -> None:
+            """Remove the subscription, if it is still registered."""
+            with self._lock:
+                if subscription in self._subscribers:
+                    self._subscribers.remove(subscription)
+
+        return unsubscribe
+
+    def stream(self, event_type: EVENT_TYPE | None = None) -> EventStream:
+        """Return an asynchronous iterator of events.
+
+        Must be called from a running event loop.
+
+        :param event_type: Only receive events of this type.
+        :type event_type: EVENT_TYPE | None
+        :return: The event stream.
+        :rtype: EventStream
+        """
+        return EventStream(self, event_type)
+
+    def emit(self, event: Event) -> None:
+        """Deliver an event to the matching subscribers.
+
+        :param event: The event to deliver.
+        :type event: Event
+        """
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for callback, event_type in subscribers:
+            if event_type is not None and event_type != event.type:
+                continue
+            try:
+                callback(event)
+            except Exception:
+                _LOGGER.exception("Error in event callback for %s", event.type)
+
+    def __reduce__(self) -> tuple[type[EventBus], tuple[()]]:
+        """Pickle as a new bus; subscribers stay in this process."""
+        return (EventBus, ())
@@ -21,3 +21,44 @@ class UnknownError(AkuvoxError):
     def __init__(self, message: str = "An unknown error occurred."):
         """Raise an error when an unknown error occurs."""
         super().__init__(message)
+
+
+class RequestFailedError(UnknownError):
+    """Exception raised when a request gets no usable response."""
+
+    def __init__(self, message: str = "Request failed."):
+        """Raise an error when a request gets no usable response."""
+        super().__init__(message)
+
+
+class CircuitOpenError(AkuvoxError):
+    """Exception raised when a request is rejected by an open circuit."""
+
+    def __init__(
+        self,
+        message: str = "Circuit is open; request rejected.",
+        retry_after: float = 0.0,
+    ):
+        """Raise an error when a request is rejected by an open circuit."""
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class DeadlineExceededError(AkuvoxError):
+    """Exception raised when an operation runs past its deadline."""
+
+    def __init__(self, message: str = "Operation deadline exceeded."):
+        """Raise an error when an operation runs past its deadline."""
+        super().__init__(message)
+
+
+class DeadlineTimeoutError(DeadlineExceededError):
+    """Exception raised when a sent request times out at its deadline.
+
+    Unlike a deadline that passes before a request is sent, this counts as a
+    failed request for circuit breakers.
+    """
+
+    def __init__(self, message: str = "Request timed out at the deadline."):
+        """Raise an error when a sent request times out at its deadline."""
+        super().__init__(message)
@@ -0,0 +1,271 @@
+# SPDX-License-Identifier: Apache-2.0
+# SPDX-FileCopyrightText: 2025 Andrew Grimberg <tykeal@bardicgrove.org>
+"""Opt-in profiling of where public API calls spend their time."""
+
+from __future__ import annotations
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Final, ParamSpec, TypeVar
+import functools
+import os
+import threading
+import time
+
+from . import _forksafe
+
+PROFILE_ENV: Final[str] = "PYAKUVOX_PROFILE"
+
+# Sections recorded inside public calls
+SECTION_NETWORK: Final[str] = "network"
+SECTION_JSON: Final[str] = "json_decode"
+SECTION_RESULT: Final[str] = "result_check"
+SECTION_BUILD: Final[str] = "build_objects"
+
+# Operation used for sections outside any profiled public call
+_NO_OPERATION: Final[str] = "<none>"
+
+_OPERATION: Final[ContextVar[str | None]] = ContextVar(
+    "pyakuvox_operation", default=None
+)
+
+P = ParamSpec("P")
+R = TypeVar("R")
+
+
+class _Timing:
+    """Accumulated time of one operation or section.
+
+    :meta private:
+    """
+
+    __slots__ = ("calls", "cpu", "wall")
+
+    def __init__(self) -> None:
+        """Initialize an empty timing."""
+        self.calls = 0
+        self.wall = 0.0
+        self.cpu = 0.0
+
+
+class Profiler:
+    """Collects wall and CPU time per public call and section.
+
+    Each profiled public call, such as ``Devices.get_devices``, is an
+    operation. Within it the time spent on network I/O, JSON decoding,
+    result checks and building ``Device``/``Community`` objects is
+    recorded separately; the rest is reported as ``self`` time. A call
+    made from inside another profiled call is counted towards the outer
+    one. CPU time is that of the calling thread.
+    """
+
+    def __init__(self, enabled: bool = False) -> None:
+        """Initialize the profiler.
+
+        :param enabled: Whether to start recording immediately.
+        :type enabled: bool
+        """
+        self.enabled = enabled
+        self._totals: dict[str, _Timing] = {}
+        self._sections: dict[tuple[str, str], _Timing] = {}
+        self._reset_locks()
+        _forksafe.track(self)
+
+    def _reset_locks(self) -> None:
+        """Create the lock guarding the recorded timings.
+
+        :meta private:
+        """
+        self._lock = threading.Lock()
+
+    def enable(self) -> None:
+        """Start recording."""
+        self.enabled = True
+
+    def disable(self) -> None:
+        """Stop recording."""
+        self.enabled = False
+
+    def reset(self) -> None:
+        """Discard everything recorded so far."""
+        with self._lock:
+            self._totals.clear()
+            self._sections.clear()
+
+    def _add(
+        self, table: dict, key: str | tuple[str, str], wall: float, cpu: float
+    ) -> None:
+        """Add one measurement to a table.
+
+        :meta private:
+        """
+        with self._lock:
+            timing = table.get(key)
+            if timing is None:
+                timing = table[key] = _Timing()
+            timing.calls += 1
+            timing.wall += wall
+            timing.cpu += cpu
+
+    @contextmanager
+    def operation(self, name: str) -> Iterator[None]:
+        """Record a block as a public API call.
+
+        :param name: The name of the call, e.g. ``Devices.get_devices``.
+        :type name: str
+        """
+        if not self.enabled or _OPERATION.get() is not None:
+            yield
+            return
+        token = _OPERATION.set(name)
+        wall, cpu = time.perf_counter(), time.thread_time()
+        try:
+            yield
+        finally:
+            _OPERATION.reset(token)
+            self._add(
+                self._totals,
+                name,
+                time.perf_counter() - wall,
+                time.thread_time() - cpu,
+            )
+
+    @contextmanager
+    def section(self, name: str) -> Iterator[None]:
+        """Record a block as a section of the current operation.
+
+        :param name: The section name, e.g. :data:`SECTION_NETWORK`.
+        :type name: str
+        """
+        if not self.enabled:
+            yield
+            return
+        operation = _OPERATION.get() or _NO_OPERATION
+        wall, cpu = time.perf_counter(), time.thread_time()
+        try:
+            yield
+        finally:
+            self._add(
+                self._sections,
+                (operation, name),
+                time.perf_counter() - wall,
+                time.thread_time() - cpu,
+            )
+
+    def stats(self) -> list[tuple[str, str, int, float, float]]:
+        """Return the recorded times.
+
+        :return: Rows of (operation, section, calls, wall, cpu) with times in
+            seconds. Each operation has a ``total`` row and a ``self`` row for
+            time outside the named sections.
+        :rtype: list[tuple[str, str, int, float, float]]
+        """
+        with self._lock:
+            totals = {k: (t.calls, t.wall, t.cpu) for k, t in self._totals.items()}
+            sections = {k: (t.calls, t.wall, t.cpu) for k, t in self._sections.items()}
+        rows = []
+        for operation in sorted({op for op, _ in sections} | set(totals)):
+            own = sorted(
+                (name, *timing)
+                for (op, name), timing in sections.items()
+                if op == operation
+            )
+            if operation in totals:
+                calls, wall, cpu = totals[operation]
+                rows.append((operation, "total", calls, wall, cpu))
+                rows.append(
+                    (
+                        operation,
+                        "self",
+                        calls,
+                        max(0.0, wall - sum(row[2] for row in own)),
+                        max(0.0, cpu - sum(row[3] for row in own)),
+                    )
+                )
+            rows.extend((operation, *row) for row in own)
+        return rows
+
+    def summary(self) -> str:
+        """Return the recorded times as a text table.
+
+        :return: The formatted table.
+        :rtype: str
+        """
+        lines = [
+            f"{'operation':<32} {'section':<14} {'calls':>8} "
+            f"{'wall ms':>12} {'cpu ms':>12}"
+        ]
+        for operation, section, calls, wall, cpu in self.stats():
+            lines.append(
+                f"{operation:<32} {section:<14} {calls:>8} "
+                f"{wall * 1e3:>12.3f} {cpu * 1e3:>12.3f}"
+            )
+        return "\n".join(lines)
+
+    def collapsed(self, cpu: bool = False) -> str:
+        """Return the recorded times in collapsed stack format.
+
+        Each line is ``operation;section microseconds`` and can be fed to
+        flamegraph tools such as ``flamegraph.pl`` or speedscope.
+
+        :param cpu: Report CPU instead of wall time.
+        :type cpu: bool
+        :return: The collapsed stacks, one per line.
+        :rtype: str
+        """
+        lines = []
+        for operation, section, _, wall, cpu_time in self.stats():
+            if section == "total":
+                continue
+            micros = round((cpu_time if cpu else wall) * 1e6)
+            stack = operation if section == "self" else f"{operation};{section}"
+            if micros:
+                lines.append(f"{stack} {micros}")
+        return "\n".join(lines) + "\n" if lines else ""
+
+    def write_collapsed(self, path: str | os.PathLike[str], cpu: bool = False) -> None:
+        """Write the recorded times in collapsed stack format to a file.
+
+        :param path: The file to write.
+        :type path: str | os.PathLike[str]
+        :param cpu: Report CPU instead of wall time.
+        :type cpu: bool
+        """
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(self.collapsed(cpu))
+
+
+def _requested() -> bool:
+    """Check if profiling is requested through the environment.
+
+    :meta private:
+    """
+    return os.environ.get(PROFILE_ENV, "").lower() in ("1", "true", "yes", "on")
+
+
+PROFILER: Final[Profiler] = Profiler(enabled=_requested())
+
+
+def profiled(name: str) -> Callable[[Callable[P, R]], Callable[P, R]]:
+    """Decorate a public API call as a profiled operation.
+
+    :param name: The name of the call.
+    :type name: str
+
+    :meta private:
+    """
+
+    def decorator(func: Callable[P, R]) -> Callable[P, R]:
+        """Wrap ``func`` to record its calls while profiling is enabled."""
+
+        @functools.wraps(func)
+        def wrapper(*args: P.args, **kwargs: P.kwargs) -> R:
+            """Call ``func``, inside an operation when profiling."""
+            if not PROFILER.enabled:
+                return func(*args, **kwargs)
+            with PROFILER.operation(name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
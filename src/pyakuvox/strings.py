@@ -0,0 +1,62 @@
+# SPDX-License-Identifier: Apache-2.0
+# SPDX-FileCopyrightText: 2025 Andrew Grimberg <tykeal@bardicgrove.org>
+"""Deduplication of repeated strings across device objects."""
+
+from __future__ import annotations
+import threading
+
+from . import _forksafe
+from .const import DEFAULT_STRING_POOL_SIZE
+
+
+class StringPool:
+    """Bounded pool handing out one shared instance per distinct string.
+
+    Device listings repeat the same unit, room, location and firmware
+    values many times, and every decoded response holds its own copy of
+    each. Passing values through a pool makes equal strings share one
+    object. When the pool reaches ``max_size`` it is emptied and starts
+    over, so memory stays bounded while values change over time.
+    """
+
+    def __init__(self, max_size: int = DEFAULT_STRING_POOL_SIZE) -> None:
+        """Initialize an empty pool.
+
+        :param max_size: Maximum number of distinct strings kept.
+        :type max_size: int
+        """
+        self.max_size = max_size
+        self._strings: dict[str, str] = {}
+        self._reset_locks()
+        _forksafe.track(self)
+
+    def _reset_locks(self) -> None:
+        """Create the lock guarding inserts.
+
+        :meta private:
+        """
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """Return the number of pooled strings."""
+        return len(self._strings)
+
+    def intern(self, value: str) -> str:
+        """Return the pooled instance equal to a string.
+
+        :param value: The string to deduplicate.
+        :type value: str
+        :return: The shared instance, or the value itself if it is new.
+        :rtype: str
+        """
+        pooled = self._strings.get(value)
+        if pooled is not None:
+            return pooled
+        with self._lock:
+            if len(self._strings) >= self.max_size:
+                self._strings.clear()
+            return self._strings.setdefault(value, value)
+
+    def __reduce__(self) -> tuple[type[StringPool], tuple[int]]:
+        """Pickle as an empty pool of the same size."""
+        return (StringPool, (self.max_size,))
@@ -0,0 +1,306 @@
+# SPDX-License-Identifier: Apache-2.0
+# SPDX-FileCopyrightText: 2025 Andrew Grimberg <tykeal@bardicgrove.org>
+"""Columnar device table for fleet-wide queries."""
+
+from __future__ import annotations
+from array import array
+from collections import Counter
+from collections.abc import Iterable, Iterator
+from itertools import compress
+from typing import TYPE_CHECKING, Any, Final
+
+from .devices import Device
+
+if TYPE_CHECKING:
+    from .communities import Community
+
+COLUMNS: Final[tuple[str, ...]] = (
+    "CommunityID",
+    "ID",
+    "Relay",
+    "Location",
+    "MAC",
+    "Type",
+    "Status",
+    "UnitName",
+    "RoomName",
+    "Name",
+    "VersionNumber",
+)
+
+# Columns with at most this many distinct values store one byte per row, so
+# row masks are built with ``bytes.translate`` instead of comparing codes in
+# Python.
+_BYTE_CODES_LIMIT: Final[int] = 256
+
+# Byte coded columns with at most this many distinct values are grouped by
+# counting each code in the row bytes instead of counting codes one by one.
+_MASK_GROUP_LIMIT: Final[int] = 64
+
+# Translation table adding one to every byte code, so code 0 stays distinct
+# from rows cleared by a mask.
+_SHIFT: Final[bytes] = bytes(range(1, 256)) + b"\x00"
+
+
+class _Column:
+    """Dictionary encoded column.
+
+    Each distinct value is stored once in ``values`` and rows hold an index
+    into it, one byte per row until the column has more than
+    ``_BYTE_CODES_LIMIT`` distinct values. Row masks are Python integers
+    holding one byte per row (row ``i`` is byte ``i``, little endian), so
+    filters combine with a single ``&`` and are counted with
+    ``int.bit_count``. Masks are built on demand and not kept, so memory does
+    not grow with the number of distinct values queried.
+
+    :meta private:
+    """
+
+    __slots__ = ("values", "codes", "_index")
+
+    def __init__(self) -> None:
+        """Initialize an empty column."""
+        self.values: list[Any] = []
+        self.codes: array[int] = array("B")
+        self._index: dict[Any, int] = {}
+
+    def extend(self, values: Iterable[Any]) -> None:
+        """Append values to the column.
+
+        :param values: The values to append.
+        :type values: Iterable[Any]
+        """
+        index = self._index
+        distinct = self.values
+        codes = []
+        for value in values:
+            code = index.get(value)
+            if code is None:
+                code = index[value] = len(distinct)
+                distinct.append(value)
+            codes.append(code)
+        if len(distinct) > _BYTE_CODES_LIMIT and self.codes.typecode == "B":
+            self.codes = array("I", self.codes)
+        self.codes.extend(codes)
+
+    @property
+    def byte_coded(self) -> bool:
+        """Check if the column stores one byte per row.
+
+        :return: True if the codes are bytes.
+        :rtype: bool
+        """
+        return self.codes.typecode == "B"
+
+    def code_mask(self, code: int) -> int:
+        """Return the row mask for a value code.
+
+        :param code: The value code.
+        :type code: int
+        :return: The row mask.
+        :rtype: int
+        """
+        if self.byte_coded:
+            table = bytearray(256)
+            table[code] = 1
+            return int.from_bytes(self.codes.tobytes().translate(table), "little")
+        # Wide codes are searched for in the raw bytes; few rows share a
+        # value in such columns, so this skips most rows without visiting
+        # them in Python.
+        raw = self.codes.tobytes()
+        needle = array("I", (code,)).tobytes()
+        width = len(needle)
+        selector = bytearray(len(self.codes))
+        found = raw.find(needle)
+        while found != -1:
+            row, offset = divmod(found, width)
+            if offset:
+                found = raw.find(needle, found + 1)
+                continue
+            selector[row] = 1
+            found = raw.find(needle, found + width)
+        return int.from_bytes(selector, "little")
+
+    def mask(self, value: Any) -> int:
+        """Return the row mask for a value.
+
+        :param value: The value to match.
+        :type value: Any
+        :return: The row mask, zero if the value is not present.
+        :rtype: int
+        """
+        code = self._index.get(value)
+        if code is None:
+            return 0
+        return self.code_mask(code)
+
+
+class DeviceTable:
+    """Columnar view of devices across communities.
+
+    Devices are stored column by column with every distinct value kept once,
+    so repeated strings such as ``UnitName`` or ``VersionNumber`` are shared
+    between rows. Filtering returns a view over the same columns and counts
+    are computed from row masks rather than by visiting each device.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty device table."""
+        self._columns: dict[str, _Column] = {name: _Column() for name in COLUMNS}
+        self._size: int = 0
+        self._mask: int | None = None
+
+    @classmethod
+    def from_communities(cls, communities: Iterable[Community]) -> DeviceTable:
+        """Build a table from the devices of several communities.
+
+        Devices are fetched for any community that has not loaded them yet,
+        waiting for them even if the client uses a ``soft_ttl``.
+
+        :param communities: The communities to include.
+        :type communities: Iterable[Community]
+        :return: A new device table.
+        :rtype: DeviceTable
+        """
+        table = cls()
+        for community in communities:
+            table.extend(community.ID, community.load_devices())
+        return table
+
+    def extend(self, community_id: Any, devices: Iterable[Device]) -> None:
+        """Append devices belonging to a community.
+
+        :param community_id: The ID of the community the devices belong to.
+        :type community_id: Any
+        :param devices: The devices to append.
+        :type devices: Iterable[Device]
+        :raises ValueError: If the table is a filtered view.
+        """
+        if self._mask is not None:
+            raise ValueError("Cannot extend a filtered device table.")
+        devices = list(devices)
+        self._columns["CommunityID"].extend([community_id] * len(devices))
+        for name in COLUMNS[1:]:
+            self._columns[name].extend([getattr(d, name) for d in devices])
+        self._size += len(devices)
+
+    def __len__(self) -> int:
+        """Return the number of rows in the table."""
+        if self._mask is None:
+            return self._size
+        return self._mask.bit_count()
+
+    def _column(self, name: str) -> _Column:
+        """Return the named column.
+
+        :raises ValueError: If the column does not exist.
+
+        :meta private:
+        """
+        try:
+            return self._columns[name]
+        except KeyError:
+            raise ValueError(
+                f"Invalid column: {name}. Must be one of {list(COLUMNS)}."
+            ) from None
+
+    def _row_selector(self) -> bytes:
+        """Return the rows selected by the view mask, one byte per row.
+
+        :meta private:
+        """
+        assert self._mask is not None
+        return self._mask.to_bytes(self._size, "little")
+
+    def filter(self, **criteria: Any) -> DeviceTable:
+        """Return a view of the rows matching all criteria.
+
+        Each keyword names a column. The value is either a single value to
+        match or a list, tuple or set of values of which any may match.
+
+        :param criteria: Column values to match.
+        :return: A filtered view sharing this table's columns.
+        :rtype: DeviceTable
+        :raises ValueError: If a column does not exist.
+        """
+        mask = self._mask
+        for name, value in criteria.items():
+            column = self._column(name)
+            if isinstance(value, (list, tuple, set, frozenset)):
+                match = 0
+                for item in value:
+                    match |= column.mask(item)
+            else:
+                match = column.mask(value)
+            mask = match if mask is None else mask & match
+
+        view = DeviceTable.__new__(DeviceTable)
+        view._columns = self._columns
+        view._size = self._size
+        view._mask = mask
+        return view
+
+    def count(self, **criteria: Any) -> int:
+        """Return the number of rows matching all criteria.
+
+        :param criteria: Column values to match, as for :meth:`filter`.
+        :return: The number of matching rows.
+        :rtype: int
+        """
+        return len(self.filter(**criteria))
+
+    def group_count(self, name: str) -> dict[Any, int]:
+        """Count rows per distinct value of a column.
+
+        :param name: The column to group by.
+        :type name: str
+        :return: A mapping of column value to number of rows.
+        :rtype: dict[Any, int]
+        :raises ValueError: If the column does not exist.
+        """
+        column = self._column(name)
+        if column.byte_coded and len(column.values) <= _MASK_GROUP_LIMIT:
+            selected = column.codes.tobytes()
+            offset = 0
+            if self._mask is not None:
+                # Shift codes up by one and clear the rows outside the view
+                shifted = int.from_bytes(selected.translate(_SHIFT), "little")
+                selected = (shifted & self._mask * 0xFF).to_bytes(self._size, "little")
+                offset = 1
+            result: dict[Any, int] = {}
+            for code, value in enumerate(column.values):
+                count = selected.count(code + offset)
+                if count:
+                    result[value] = count
+            return result
+
+        codes: Iterable[int] = column.codes
+        if self._mask is not None:
+            codes = compress(codes, self._row_selector())
+        return {column.values[code]: n for code, n in Counter(codes).items()}
+
+    def column(self, name: str) -> list[Any]:
+        """Return the values of a column for the selected rows.
+
+        :param name: The column name.
+        :type name: str
+        :return: The column values in row order.
+        :rtype: list[Any]
+        :raises ValueError: If the column does not exist.
+        """
+        column = self._column(name)
+        values = column.values
+        codes: Iterable[int] = column.codes
+        if self._mask is not None:
+            codes = compress(codes, self._row_selector())
+        return [values[code] for code in codes]
+
+    def rows(self) -> Iterator[dict[str, Any]]:
+        """Iterate over the selected rows as dictionaries.
+
+        :return: An iterator of row dictionaries keyed by column name.
+        :rtype: Iterator[dict[str, Any]]
+        """
+        columns = [self.column(name) for name in COLUMNS]
+        for row in zip(*columns):
+            yield dict(zip(COLUMNS, row))
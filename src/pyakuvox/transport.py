@@ -0,0 +1,201 @@
+# SPDX-License-Identifier: Apache-2.0
+# SPDX-FileCopyrightText: 2025 Andrew Grimberg <tykeal@bardicgrove.org>
+"""Optional HTTP/2 transport for requests to the Akuvox API."""
+
+from __future__ import annotations
+from types import ModuleType
+from typing import TYPE_CHECKING, Any
+from urllib.parse import urlsplit
+import asyncio
+import threading
+
+import requests
+
+from . import _forksafe
+from .deadline import Timeout
+
+if TYPE_CHECKING:
+    import httpx
+
+
+def _import_httpx() -> ModuleType:
+    """Import httpx, explaining how to install it if it is missing.
+
+    :raises ImportError: If httpx is not installed.
+
+    :meta private:
+    """
+    try:
+        import httpx
+    except ImportError as e:
+        raise ImportError(
+            "HTTP/2 support requires the http2 extra: pip install 'pyakuvox[http2]'"
+        ) from e
+    return httpx
+
+
+def _origin(url: str) -> str:
+    """Return the scheme and network location of a URL.
+
+    :meta private:
+    """
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+class HTTP2Transport:
+    """Send API requests through one shared httpx client with HTTP/2.
+
+    HTTP/2 is used when the server negotiates it, so concurrent requests,
+    such as device listings of many communities, are multiplexed over a
+    single connection instead of opening one connection each. The first
+    response from each server shows whether it does; if it answers with
+    HTTP/1.1, later requests to it go through ``requests`` like those of
+    the default transport, which handles many concurrent HTTP/1.1
+    requests with less overhead than the httpx connection pool.
+
+    The synchronous httpx client cannot multiplex requests from several
+    threads over one HTTP/2 connection safely, so an asynchronous client
+    runs on an event loop in a background thread and requests from any
+    thread are handed to it. Both are started by the first request. A
+    forked child or unpickled copy drops them and starts its own on its
+    next request, so it never shares the parent's connections.
+    """
+
+    def __init__(self, **options: Any) -> None:
+        """Initialize the transport.
+
+        :param options: Additional keyword arguments for ``httpx.AsyncClient``,
+            e.g. ``http1=False`` to use HTTP/2 without negotiation on
+            plain-text connections.
+        :raises ImportError: If httpx is not installed.
+        """
+        self._options = options
+        self._http2: dict[str, bool] = {}
+        self._httpx = _import_httpx()
+        self._reset_locks()
+        _forksafe.track(self)
+
+    def _reset_locks(self) -> None:
+        """Create the lock and drop the client of a parent process.
+
+        :meta private:
+        """
+        self._lock = threading.Lock()
+        self._discard_client()
+
+    def _discard_client(self) -> None:
+        """Forget the client and event loop so the next request starts new ones.
+
+        Nothing is closed: in a forked child the loop thread does not exist
+        and the connections belong to the parent.
+
+        :meta private:
+        """
+        self._client: httpx.AsyncClient | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._thread: threading.Thread | None = None
+
+    def _start_client(self) -> tuple[httpx.AsyncClient, asyncio.AbstractEventLoop]:
+        """Return the client and its event loop, starting them if needed.
+
+        :meta private:
+        """
+        with self._lock:
+            if self._client is None or self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(
+                    target=self._loop.run_forever, name="pyakuvox-http2", daemon=True
+                )
+                self._thread.start()
+                self._client = self._httpx.AsyncClient(http2=True, **self._options)
+            return self._client, self._loop
+
+    def __getstate__(self) -> dict[str, Any]:
+        """Return the state to pickle, without the client."""
+        return {"_options": self._options}
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        """Restore a pickled transport, which starts its own client."""
+        self.__dict__.update(state)
+        self._http2 = {}
+        self._httpx = _import_httpx()
+        self._reset_locks()
+        _forksafe.track(self)
+
+    def uses_http2(self, url: str) -> bool | None:
+        """Check if the server of a URL negotiated HTTP/2.
+
+        :param url: A URL on the server.
+        :type url: str
+        :return: True if it did, False if not, None if not probed yet.
+        :rtype: bool | None
+        """
+        return self._http2.get(_origin(url))
+
+    def request(
+        self, method: str, url: str, timeout: Timeout, **kwargs: Any
+    ) -> httpx.Response | requests.Response:
+        """Send a request and check its HTTP status.
+
+        Errors are raised as the matching ``requests`` exceptions, so they
+        are handled like those of the default transport.
+
+        :param method: HTTP method to use (e.g., 'GET', 'POST').
+        :type method: str
+        :param url: The URL to send the request to.
+        :type url: str
+        :param timeout: Timeout in seconds, either a single value or a
+            (connect, read) pair.
+        :type timeout: float | tuple[float, float]
+        :param kwargs: Additional keyword arguments for the request.
+        :return: The response.
+        :rtype: httpx.Response | requests.Response
+        :raises requests.Timeout: If the request times out.
+        :raises requests.RequestException: If the request fails.
+        """
+        origin = _origin(url)
+        if self._http2.get(origin) is False:
+            fallback = requests.request(method, url, timeout=timeout, **kwargs)
+            fallback.raise_for_status()
+            return fallback
+
+        # Certificate verification is a client setting in httpx
+        kwargs.pop("verify", None)
+        connect, read = timeout if isinstance(timeout, tuple) else (timeout, timeout)
+        kwargs["timeout"] = self._httpx.Timeout(read, connect=connect)
+        client, loop = self._start_client()
+        response = asyncio.run_coroutine_threadsafe(
+            self._request(client, method, url, **kwargs), loop
+        ).result()
+        self._http2[origin] = response.http_version == "HTTP/2"
+        return response
+
+    async def _request(
+        self, client: httpx.AsyncClient, method: str, url: str, **kwargs: Any
+    ) -> httpx.Response:
+        """Send a request on the event loop.
+
+        :meta private:
+        """
+        httpx = self._httpx
+        try:
+            response = await client.request(method, url, **kwargs)
+            response.raise_for_status()
+        except httpx.TimeoutException as e:
+            raise requests.Timeout(str(e)) from e
+        except httpx.HTTPError as e:
+            raise requests.RequestException(str(e)) from e
+        return response
+
+    def close(self) -> None:
+        """Close the connections and stop the background event loop."""
+        with self._lock:
+            client, loop, thread = self._client, self._loop, self._thread
+            self._discard_client()
+        if client is None or loop is None or thread is None:
+            return
+        asyncio.run_coroutine_threadsafe(client.aclose(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
@@ -2,7 +2,18 @@
 # SPDX-FileCopyrightText: 2023 Andrew Grimberg <tykeal@bardicgrove.org>
 """Tests for the Akuvox API module."""
 
+import pickle
+
+import pytest
+
 from pyakuvox.api import Akuvox
+from pyakuvox.auth import Auth
+from pyakuvox.cache import DiskCache
+from pyakuvox.communities import Community
+from pyakuvox.const import RESULT_SUCCESS, SUBDOMAINS_LIST
+from pyakuvox.deadline import Deadline
+from pyakuvox.exceptions import UnknownError
+from pyakuvox.strings import StringPool
 
 
 class MockAuth:
@@ -14,3 +25,146 @@ def test_akuvox_init_sets_auth():
     mock_auth = MockAuth()
     akuvox = Akuvox(auth=mock_auth)
     assert akuvox.auth is mock_auth
+
+
+def test_akuvox_pickle_round_trip():
+    """Test an Akuvox client and its communities pickle with their data."""
+    auth = Auth(SUBDOMAINS_LIST[0], "user", "pass")
+    auth._token = "fake-token"
+    akuvox = Akuvox(auth)
+    community = Community({"ID": 7, "Location": "Here"}, auth)
+    community._devices._load_rows([{"ID": 1}])
+
+    restored_akuvox, restored_community = pickle.loads(
+        pickle.dumps((akuvox, community))
+    )
+    assert restored_akuvox.auth.token == "fake-token"
+    assert restored_akuvox.communities._auth is restored_akuvox.auth
+    assert restored_community.ID == 7
+    assert restored_community.Location == "Here"
+    assert [d.ID for d in restored_community.devices] == ["1"]
+
+
+@pytest.fixture
+def make_akuvox(mocker):
+    """Return a factory of clients whose requests are answered from a mapping."""
+
+    def factory(responses, **kwargs):
+        """Return a client answering from ``responses`` and its call log."""
+        calls = []
+
+        def fake_requests(method, url, **request_kwargs):
+            """Record the call and answer the login or the device listing."""
+            headers = request_kwargs.get("headers", {})
+            calls.append((url, headers.get("x-community-id")))
+            if url.endswith("/property/login"):
+                return {"result": RESULT_SUCCESS, "token": "t", "communityID": "42"}
+            return {"data": {"row": responses[headers["x-community-id"]]}}
+
+        mocker.patch("pyakuvox.auth._requests", side_effect=fake_requests)
+        auth = Auth(SUBDOMAINS_LIST[0], "user", "pass")
+        return Akuvox(auth, **kwargs), calls
+
+    return factory
+
+
+def test_community_uses_login_community_id(make_akuvox):
+    """Test community() defaults to the login's community without a listing."""
+    akuvox, calls = make_akuvox({"42": [{"ID": 1, "Name": "Door"}]})
+    community = akuvox.community()
+    assert community.ID == "42"
+    assert [d.Name for d in community.devices] == ["Door"]
+    assert akuvox.community("42") is community
+    urls = [url for url, _ in calls]
+    assert not any(url.endswith("/property/comunityinfo") for url in urls)
+    assert urls[-1].endswith("/property/selectdevice")
+
+
+class MagicAuth:
+    """Mock Auth that is authenticated without a community ID."""
+
+    community_id = None
+
+    def ensure_authenticated(self):
+        """Do nothing; the user is already authenticated."""
+
+
+def test_community_without_login_community_id_raises():
+    """Test community() raises when the login returned no community ID."""
+    akuvox = Akuvox(MagicAuth())
+    with pytest.raises(UnknownError) as excinfo:
+        akuvox.community()
+    assert "community ID" in str(excinfo.value)
+
+
+def test_devices_for_fetches_known_communities(make_akuvox):
+    """Test devices_for fetches each community once, without a listing."""
+    akuvox, calls = make_akuvox(
+        {"1": [{"ID": 10}], "2": [{"ID": 20}, {"ID": 21}], "3": []}
+    )
+    result = akuvox.devices_for(["1", "2", "3"], deadline=30)
+    assert {cid: [d.ID for d in devs] for cid, devs in result.items()} == {
+        "1": ["10"],
+        "2": ["20", "21"],
+        "3": [],
+    }
+    # Already loaded devices are reused unless a refresh is requested
+    akuvox.devices_for(["1", "2"])
+    assert len(calls) == 4
+    akuvox.devices_for(["1"], refresh=True)
+    assert len(calls) == 5
+    assert akuvox.devices_for([]) == {}
+    assert [url for url, _ in calls].count(calls[0][0]) == 1
+    assert sorted(cid for _, cid in calls[1:4]) == ["1", "2", "3"]
+
+
+def test_devices_for_waits_for_devices_with_soft_ttl(make_akuvox):
+    """Test devices_for returns loaded devices even with a soft TTL."""
+    akuvox, calls = make_akuvox({"1": [{"ID": 10}], "2": [{"ID": 20}]}, soft_ttl=60)
+    result = akuvox.devices_for(["1", "2"])
+    assert {cid: [d.ID for d in devs] for cid, devs in result.items()} == {
+        "1": ["10"],
+        "2": ["20"],
+    }
+    assert len(calls) == 3
+    assert not akuvox.community("1")._devices.is_refreshing
+
+
+def test_devices_for_applies_deadline_in_workers():
+    """Test the devices_for deadline reaches the worker threads."""
+    seen = []
+
+    class DeadlineAuth(MagicAuth):
+        """Auth recording the deadline of each request."""
+
+        def requests(self, *args, **kwargs):
+            """Record the current deadline."""
+            seen.append(Deadline.current())
+            return {}
+
+    Akuvox(DeadlineAuth()).devices_for(["1", "2"], deadline=5)
+    assert len(seen) == 2
+    assert all(d is not None and d.remaining() <= 5 for d in seen)
+
+
+def test_akuvox_pool_reaches_devices():
+    """Test the client's string pool is used by its communities."""
+    akuvox = Akuvox(MagicAuth())
+    assert isinstance(akuvox.pool, StringPool)
+    assert akuvox.community("1")._devices._pool is akuvox.pool
+    pool = StringPool()
+    assert Akuvox(MagicAuth(), pool=pool).communities._pool is pool
+
+
+def test_cache_namespace_derived_from_account(tmp_path):
+    """Test accounts sharing a cache file do not share entries."""
+    cache = DiskCache(tmp_path / "cache.db")
+    first = Akuvox(Auth(SUBDOMAINS_LIST[0], "one", "pass"), cache)
+    second = Akuvox(Auth(SUBDOMAINS_LIST[0], "two", "pass"), cache)
+    assert first.cache.namespace == f"{first.auth.base_url}|one"
+    first.cache.set("communities", [1])
+    assert second.cache.get("communities") is None
+    assert cache.namespace == ""
+
+    named = DiskCache(tmp_path / "cache.db", namespace="mine")
+    assert Akuvox(first.auth, named).cache is named
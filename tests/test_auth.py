@@ -2,9 +2,14 @@
 # SPDX-FileCopyrightText: 2023 Andrew Grimberg <tykeal@bardicgrove.org>
 """Tests for the Akuvox authentication module."""
 
+import pickle
+import threading
+import time
 import pytest
+from concurrent.futures import ThreadPoolExecutor
 from unittest.mock import patch, MagicMock
 from pyakuvox.auth import Auth
+from pyakuvox.breaker import CircuitBreaker
 from pyakuvox.const import SUBDOMAINS_LIST, BASE_DOMAIN
 from pyakuvox.const import RESULT_SUCCESS, RESULT_INVALID_USERNAME_OR_PASSWORD
 from pyakuvox.exceptions import NotAuthenticatedError, UnknownError
@@ -200,3 +205,58 @@ def test_auth_requests_triggers_authenticate(mock_authenticate, mock__requests):
     with pytest.raises(NotAuthenticatedError):
         auth.requests("POST", "/test", json={"foo": "bar"})
     mock_authenticate.assert_called_once()
+
+
+@patch("pyakuvox.auth._requests")
+def test_auth_requests_single_login_under_concurrency(mock__requests):
+    """Test 64 threads sharing an Auth trigger one login and see one token."""
+    threads = 64
+    auth = Auth(SUBDOMAINS_LIST[0], "user", "pass")
+    barrier = threading.Barrier(threads)
+    logins = []
+
+    def fake_requests(method, url, **kwargs):
+        """Log in slowly and echo the token of other requests."""
+        if url.endswith("/property/login"):
+            logins.append(url)
+            time.sleep(0.05)
+            return {
+                "result": RESULT_SUCCESS,
+                "token": f"token-{len(logins)}",
+                "communityID": "community_123",
+            }
+        return {"token": kwargs["headers"]["x-auth-token"]}
+
+    mock__requests.side_effect = fake_requests
+
+    def worker(_):
+        """Make a request once all threads are ready."""
+        barrier.wait()
+        response = auth.requests("GET", "/property/comunityinfo")
+        return response["token"], auth.community_id
+
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        results = list(executor.map(worker, range(threads)))
+
+    assert len(logins) == 1
+    assert set(results) == {("token-1", "community_123")}
+
+
+def test_auth_pickle_round_trip():
+    """Test a pickled Auth keeps its token and gets a new lock."""
+    auth = Auth(SUBDOMAINS_LIST[0], "user", "pass", breaker=CircuitBreaker())
+    auth._token = "fake-token"
+    auth._community_id = "community_123"
+    restored = pickle.loads(pickle.dumps(auth))
+    assert restored.token == "fake-token"
+    assert restored.community_id == "community_123"
+    assert restored.is_authenticated is True
+    assert restored._lock is not auth._lock
+    assert restored._lock.acquire(blocking=False)
+    assert isinstance(restored.breaker, CircuitBreaker)
+
+
+def test_init_base_url_override():
+    """Test an explicit base URL replaces the subdomain derived one."""
+    auth = Auth(SUBDOMAINS_LIST[0], "user", "pass", base_url="http://127.0.0.1:8080/")
+    assert auth.base_url == "http://127.0.0.1:8080"
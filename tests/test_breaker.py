@@ -0,0 +1,209 @@
+# SPDX-License-Identifier: Apache-2.0
+# SPDX-FileCopyrightText: 2025 Andrew Grimberg <tykeal@bardicgrove.org>
+"""Tests for the Akuvox CircuitBreaker module."""
+
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+import requests
+
+from pyakuvox.auth import Auth
+from pyakuvox.breaker import CIRCUIT_STATE, CircuitBreaker
+from pyakuvox.const import RESULT_SUCCESS, SUBDOMAINS_LIST
+from pyakuvox.exceptions import (
+    CircuitOpenError,
+    DeadlineExceededError,
+    DeadlineTimeoutError,
+    RequestFailedError,
+    UnknownError,
+)
+
+BASE = "https://api.test"
+
+
+def fail():
+    """Raise a request failure."""
+    raise RequestFailedError("Request failed: boom")
+
+
+def trip(breaker, path="/path"):
+    """Record enough failures to open a circuit."""
+    for _ in range(breaker.minimum_calls):
+        with pytest.raises(RequestFailedError):
+            breaker.call(BASE, path, fail)
+
+
+def test_invalid_failure_threshold():
+    """Test an out of range failure threshold is rejected."""
+    with pytest.raises(ValueError) as excinfo:
+        CircuitBreaker(failure_threshold=0)
+    assert "Invalid failure_threshold" in str(excinfo.value)
+
+
+def test_call_returns_result_and_stays_closed():
+    """Test successful calls pass through a closed circuit."""
+    breaker = CircuitBreaker()
+    assert breaker.call(BASE, "/path", lambda x: x * 2, 21) == 42
+    assert breaker.state(BASE, "/path") == CIRCUIT_STATE.CLOSED
+
+
+def test_failures_open_circuit_and_fail_fast():
+    """Test reaching the failure threshold opens only the affected circuit."""
+    breaker = CircuitBreaker(minimum_calls=3)
+    trip(breaker)
+    assert breaker.state(BASE, "/path") == CIRCUIT_STATE.OPEN
+    func = MagicMock()
+    with pytest.raises(CircuitOpenError) as excinfo:
+        breaker.call(BASE, "/path", func)
+    assert excinfo.value.retry_after > 0
+    func.assert_not_called()
+    assert breaker.state(BASE, "/other") == CIRCUIT_STATE.CLOSED
+    assert breaker.call(BASE, "/other", lambda: "ok") == "ok"
+
+
+def test_failure_rate_below_threshold_stays_closed():
+    """Test a failure rate under the threshold keeps the circuit closed."""
+    breaker = CircuitBreaker(failure_threshold=0.5, minimum_calls=4)
+    for _ in range(3):
+        breaker.call(BASE, "/path", lambda: None)
+    with pytest.raises(RequestFailedError):
+        breaker.call(BASE, "/path", fail)
+    assert breaker.state(BASE, "/path") == CIRCUIT_STATE.CLOSED
+
+
+def test_api_errors_do_not_count_as_failures():
+    """Test errors other than request failures leave the circuit closed."""
+    breaker = CircuitBreaker(minimum_calls=1)
+
+    def api_error():
+        """Raise an error result returned by the API."""
+        raise UnknownError("API request failed with result -1")
+
+    with pytest.raises(UnknownError):
+        breaker.call(BASE, "/path", api_error)
+    assert breaker.state(BASE, "/path") == CIRCUIT_STATE.CLOSED
+
+
+@patch("pyakuvox.breaker.time.monotonic")
+def test_half_open_probe_success_closes(mock_monotonic):
+    """Test a successful probe after the reset timeout closes the circuit."""
+    mock_monotonic.return_value = 100.0
+    breaker = CircuitBreaker(minimum_calls=2, reset_timeout=10)
+    trip(breaker)
+    mock_monotonic.return_value = 111.0
+
+    def probe():
+        """Check the circuit admits a single probe."""
+        assert breaker.state(BASE, "/path") == CIRCUIT_STATE.HALF_OPEN
+        # Only one probe is admitted at a time
+        with pytest.raises(CircuitOpenError):
+            breaker.call(BASE, "/path", MagicMock())
+        return "ok"
+
+    assert breaker.call(BASE, "/path", probe) == "ok"
+    assert breaker.state(BASE, "/path") == CIRCUIT_STATE.CLOSED
+
+
+@patch("pyakuvox.breaker.time.monotonic")
+def test_half_open_probe_failure_reopens(mock_monotonic):
+    """Test a failed probe opens the circuit again."""
+    mock_monotonic.return_value = 100.0
+    breaker = CircuitBreaker(minimum_calls=2, reset_timeout=10)
+    trip(breaker)
+    mock_monotonic.return_value = 111.0
+    with pytest.raises(RequestFailedError):
+        breaker.call(BASE, "/path", fail)
+    assert breaker.state(BASE, "/path") == CIRCUIT_STATE.OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.call(BASE, "/path", MagicMock())
+
+
+@patch("pyakuvox.breaker.time.monotonic")
+def test_half_open_probe_other_error_releases_probe(mock_monotonic):
+    """Test a probe ending in another error lets the next probe through."""
+    mock_monotonic.return_value = 100.0
+    breaker = CircuitBreaker(minimum_calls=2, reset_timeout=10)
+    trip(breaker)
+    mock_monotonic.return_value = 111.0
+
+    def api_error():
+        """Raise an error result returned by the API."""
+        raise UnknownError("API request failed")
+
+    with pytest.raises(UnknownError):
+        breaker.call(BASE, "/path", api_error)
+    assert breaker.state(BASE, "/path") == CIRCUIT_STATE.HALF_OPEN
+    assert breaker.call(BASE, "/path", lambda: "ok") == "ok"
+
+
+def test_late_failure_does_not_extend_open_circuit():
+    """Test outcomes of requests admitted before opening keep the open time."""
+    breaker = CircuitBreaker(minimum_calls=2)
+
+    def fail_after_trip():
+        """Fail after other requests opened the circuit."""
+        trip(breaker)
+        raise RequestFailedError("late")
+
+    with pytest.raises(RequestFailedError):
+        breaker.call(BASE, "/path", fail_after_trip)
+    assert breaker.state(BASE, "/path") == CIRCUIT_STATE.OPEN
+
+
+@patch("pyakuvox.auth._requests")
+def test_auth_requests_use_breaker(mock__requests):
+    """Test Auth routes login and requests through the breaker per path."""
+    breaker = CircuitBreaker(minimum_calls=1)
+    auth = Auth(SUBDOMAINS_LIST[0], "user", "pass", breaker=breaker)
+    mock__requests.return_value = {"result": RESULT_SUCCESS, "token": "t"}
+    auth.requests("GET", "property/selectdevice")
+    urls = [call.args[1] for call in mock__requests.call_args_list]
+    assert urls == [
+        f"{auth.base_url}/property/login",
+        f"{auth.base_url}/property/selectdevice",
+    ]
+
+    mock__requests.side_effect = RequestFailedError("Request failed")
+    with pytest.raises(RequestFailedError):
+        auth.requests("GET", "/property/selectdevice")
+    with pytest.raises(CircuitOpenError):
+        auth.requests("GET", "/property/selectdevice")
+    assert breaker.state(auth.base_url, "/property/login") == CIRCUIT_STATE.CLOSED
+
+
+@patch("pyakuvox.auth.requests.request")
+def test_timeouts_at_deadline_count_as_failures(mock_request):
+    """Test requests timing out at their deadline open the circuit."""
+
+    def time_out(*args, **kwargs):
+        """Time out once the clamped read timeout has passed."""
+        time.sleep(kwargs["timeout"][1])
+        raise requests.Timeout("read timed out")
+
+    mock_request.side_effect = time_out
+    breaker = CircuitBreaker(minimum_calls=2)
+    auth = Auth(SUBDOMAINS_LIST[0], "user", "pass", breaker=breaker)
+    auth._token = "t"
+    # A deadline that passed before sending is not the server's fault
+    with pytest.raises(DeadlineExceededError) as excinfo:
+        auth.requests("GET", "/path", deadline=0)
+    assert not isinstance(excinfo.value, DeadlineTimeoutError)
+    mock_request.assert_not_called()
+    for _ in range(2):
+        with pytest.raises(DeadlineTimeoutError):
+            auth.requests("GET", "/path", deadline=0.02)
+    assert breaker.state(auth.base_url, "/path") == CIRCUIT_STATE.OPEN
+    with pytest.raises(CircuitOpenError):
+        auth.requests("GET", "/path", deadline=0.02)
+
+
+def test_breaker_pickle_round_trip():
+    """Test a pickled breaker keeps its circuits and gets a new lock."""
+    import pickle
+
+    breaker = CircuitBreaker(minimum_calls=1)
+    trip(breaker)
+    restored = pickle.loads(pickle.dumps(breaker))
+    assert restored.state(BASE, "/path") == CIRCUIT_STATE.OPEN
+    assert restored._lock is not breaker._lock
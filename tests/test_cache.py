@@ -0,0 +1,79 @@
+# SPDX-License-Identifier: Apache-2.0
+# SPDX-FileCopyrightText: 2025 Andrew Grimberg <tykeal@bardicgrove.org>
+"""Tests for the Akuvox DiskCache module."""
+
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from pyakuvox.cache import CacheEntry, DiskCache
+
+
+def _store(path, key, value):
+    """Store a value from another process."""
+    DiskCache(path).set(key, value)
+
+
+def test_get_missing_key_returns_none(tmp_path):
+    """Test get returns None for a key that was never stored."""
+    cache = DiskCache(tmp_path / "cache.db")
+    assert cache.get("missing") is None
+
+
+def test_set_and_get_round_trip(tmp_path):
+    """Test stored payloads are returned with their fetch time."""
+    cache = DiskCache(tmp_path / "cache.db")
+    before = time.time()
+    cache.set("communities", [{"ID": 1, "Location": "Here"}])
+    entry = cache.get("communities")
+    assert isinstance(entry, CacheEntry)
+    assert entry.payload == [{"ID": 1, "Location": "Here"}]
+    assert entry.fetched_at >= before
+    assert 0 <= entry.age < 60
+
+
+def test_set_replaces_previous_entry(tmp_path):
+    """Test set overwrites a previously stored payload."""
+    cache = DiskCache(tmp_path / "cache.db")
+    cache.set("key", [1])
+    cache.set("key", [2])
+    assert cache.get("key").payload == [2]
+
+
+def test_namespaces_are_separate(tmp_path):
+    """Test entries of different namespaces do not collide."""
+    path = tmp_path / "cache.db"
+    DiskCache(path, namespace="a").set("key", "a")
+    DiskCache(path, namespace="b").set("key", "b")
+    assert DiskCache(path, namespace="a").get("key").payload == "a"
+    assert DiskCache(path, namespace="b").get("key").payload == "b"
+
+
+def test_shared_between_processes(tmp_path):
+    """Test entries written by another process are visible."""
+    path = str(tmp_path / "cache.db")
+    cache = DiskCache(path)
+    with ProcessPoolExecutor(max_workers=2) as executor:
+        list(executor.map(_store, [path] * 4, ["k1", "k2", "k3", "k4"], range(4)))
+    assert [cache.get(f"k{i + 1}").payload for i in range(4)] == [0, 1, 2, 3]
+
+
+def test_fresh_skips_entries_older_than_max_age(tmp_path):
+    """Test fresh reads only return entries younger than max_age."""
+    cache = DiskCache(tmp_path / "cache.db", max_age=60)
+    cache.set("key", [1])
+    assert cache.get("key", fresh=True).payload == [1]
+    old = DiskCache(tmp_path / "cache.db", max_age=0)
+    time.sleep(0.01)
+    assert old.get("key", fresh=True) is None
+    assert old.get("key").payload == [1]
+
+
+def test_with_namespace(tmp_path):
+    """Test with_namespace shares the file and max_age, not the entries."""
+    cache = DiskCache(tmp_path / "cache.db", max_age=5)
+    cache.set("key", "shared")
+    other = cache.with_namespace("account")
+    assert other.path == cache.path
+    assert other.namespace == "account"
+    assert other.max_age == 5
+    assert other.get("key") is None
@@ -0,0 +1,207 @@
+# SPDX-License-Identifier: Apache-2.0
+# SPDX-FileCopyrightText: 2025 Andrew Grimberg <tykeal@bardicgrove.org>
+"""Tests for the Akuvox command line tool."""
+
+import io
+import json
+from unittest.mock import patch
+
+import pytest
+
+from pyakuvox.cli import ENV_PASSWORD, ENV_SUBDOMAIN, ENV_USERNAME, main
+from pyakuvox.const import RESULT_SUCCESS, SUBDOMAINS_LIST
+from pyakuvox.exceptions import RequestFailedError
+
+CREDENTIALS = ["--subdomain", SUBDOMAINS_LIST[0], "--username", "u", "--password", "p"]
+
+COMMUNITIES = [{"ID": 1, "Location": "North"}, {"ID": 2, "Location": "South"}]
+
+DEVICES = {
+    "1": [
+        {"ID": 10, "Name": "Gate", "Type": "1", "Status": "1"},
+        {"ID": 11, "Name": "Flat", "Type": "2", "Status": "0"},
+    ],
+    "2": [{"ID": 20, "Name": "Stairs", "Type": "0", "Status": "1"}],
+}
+
+
+def fake_api(devices=DEVICES, failing=()):
+    """Patch _requests to answer from the given listings."""
+    calls = []
+
+    def fake_requests(method, url, **kwargs):
+        """Record the call and answer from the listings."""
+        calls.append((url, kwargs))
+        if url.endswith("/property/login"):
+            return {"result": RESULT_SUCCESS, "token": "t"}
+        if url.endswith("/property/comunityinfo"):
+            return {"data": COMMUNITIES}
+        community_id = kwargs["headers"]["x-community-id"]
+        if community_id in failing:
+            raise RequestFailedError("boom")
+        return {"data": {"row": devices[community_id]}}
+
+    return patch("pyakuvox.auth._requests", side_effect=fake_requests), calls
+
+
+def run(argv, **kwargs):
+    """Run the tool and return its exit status and output."""
+    out = io.StringIO()
+    status = main(argv, stdout=out, **kwargs)
+    return status, out.getvalue()
+
+
+def test_communities_ndjson():
+    """Test communities are listed as NDJSON."""
+    patcher, _ = fake_api()
+    with patcher:
+        status, out = run([*CREDENTIALS, "communities"])
+    assert status == 0
+    assert [json.loads(line) for line in out.splitlines()] == COMMUNITIES
+
+
+def test_credentials_from_environment(monkeypatch):
+    """Test credentials are read from the environment."""
+    monkeypatch.setenv(ENV_SUBDOMAIN, SUBDOMAINS_LIST[0])
+    monkeypatch.setenv(ENV_USERNAME, "u")
+    monkeypatch.setenv(ENV_PASSWORD, "p")
+    patcher, calls = fake_api()
+    with patcher:
+        status, out = run(["--timeout", "5", "--format", "csv", "communities"])
+    assert status == 0
+    assert out.splitlines() == ["ID,Location", "1,North", "2,South"]
+    assert calls[0][1]["json"] == {"Account": "u", "passwd": "p"}
+    assert calls[0][1]["timeout"] == 5
+
+
+def test_missing_credentials(monkeypatch, capsys):
+    """Test the tool exits with a usage error without credentials."""
+    for name in (ENV_SUBDOMAIN, ENV_USERNAME, ENV_PASSWORD):
+        monkeypatch.delenv(name, raising=False)
+    with pytest.raises(SystemExit) as excinfo:
+        main(["--subdomain", SUBDOMAINS_LIST[0], "communities"])
+    assert excinfo.value.code == 2
+    assert "missing credentials: username, password" in capsys.readouterr().err
+
+
+def test_devices_of_all_communities():
+    """Test devices of every listed community are streamed."""
+    patcher, _ = fake_api()
+    with patcher:
+        status, out = run([*CREDENTIALS, "devices", "--workers", "2"])
+    assert status == 0
+    rows = [json.loads(line) for line in out.splitlines()]
+    assert {(r["CommunityID"], r["ID"], r["Type"], r["Status"]) for r in rows} == {
+        ("1", "10", "DOOR_PHONE", "ONLINE"),
+        ("1", "11", "INDOOR_MONITOR", "OFFLINE"),
+        ("2", "20", "STAIR_PHONE", "ONLINE"),
+    }
+
+
+def test_devices_filtered_csv():
+    """Test type and status filters are passed to the API and applied."""
+    patcher, calls = fake_api()
+    with patcher:
+        status, out = run(
+            [
+                *CREDENTIALS,
+                "--format",
+                "csv",
+                "devices",
+                "--community",
+                "1",
+                "--type",
+                "door-phone",
+                "--status",
+                "online",
+            ]
+        )
+    assert status == 0
+    lines = out.splitlines()
+    assert lines[0].startswith("CommunityID,ID,")
+    assert len(lines) == 2
+    assert lines[1].startswith("1,10,")
+    assert calls[-1][1]["params"] == {"Type": "1", "Status": "1"}
+    assert not any(url.endswith("/property/comunityinfo") for url, _ in calls)
+
+
+def test_devices_community_failure(capsys):
+    """Test a failing community is reported without stopping the others."""
+    patcher, _ = fake_api(failing=("2",))
+    with patcher:
+        status, out = run([*CREDENTIALS, "devices"])
+    assert status == 1
+    assert {json.loads(line)["ID"] for line in out.splitlines()} == {"10", "11"}
+    assert "pyakuvox: error: community 2: boom" in capsys.readouterr().err
+
+
+def test_request_failure(capsys):
+    """Test an API error is reported with a non-zero exit status."""
+    with patch("pyakuvox.auth._requests", side_effect=RequestFailedError("down")):
+        status, out = run([*CREDENTIALS, "communities"])
+    assert status == 1
+    assert out == ""
+    assert "pyakuvox: error: down" in capsys.readouterr().err
+
+
+def test_devices_watch_prints_status_changes():
+    """Test watch mode prints only devices whose status changed."""
+    devices = {"1": [dict(row) for row in DEVICES["1"]]}
+    patcher, calls = fake_api(devices)
+    polls = []
+
+    def sleep(seconds):
+        """Change a status on the first poll and stop on the third."""
+        polls.append(seconds)
+        if len(polls) == 1:
+            devices["1"][1]["Status"] = "1"
+        if len(polls) == 3:
+            raise KeyboardInterrupt
+
+    with patcher:
+        status, out = run(
+            [*CREDENTIALS, "devices", "--community", "1", "--watch", "--interval", "5"],
+            sleep=sleep,
+        )
+    assert status == 0
+    assert polls == [5, 5, 5]
+    rows = [json.loads(line) for line in out.splitlines()]
+    assert [(r["ID"], r["Status"]) for r in rows] == [
+        ("10", "ONLINE"),
+        ("11", "OFFLINE"),
+        ("11", "ONLINE"),
+    ]
+    assert len(calls) == 4
+
+
+def test_devices_watch_with_status_filter():
+    """Test watch mode notices devices leaving and entering a status."""
+    devices = {"1": [dict(row) for row in DEVICES["1"]]}
+    patcher, calls = fake_api(devices)
+    polls = []
+
+    def sleep(seconds):
+        """Bring the monitor online and take the gate offline and back."""
+        polls.append(seconds)
+        if len(polls) == 1:
+            devices["1"][1]["Status"] = "1"
+        if len(polls) == 2:
+            devices["1"][0]["Status"] = "0"
+        if len(polls) == 3:
+            devices["1"][0]["Status"] = "1"
+        if len(polls) == 4:
+            raise KeyboardInterrupt
+
+    argv = [*CREDENTIALS, "devices", "--community", "1", "--status", "online"]
+    with patcher:
+        status, out = run([*argv, "--watch"], sleep=sleep)
+    assert status == 0
+    rows = [json.loads(line) for line in out.splitlines()]
+    assert [(r["ID"], r["Status"]) for r in rows] == [
+        ("10", "ONLINE"),
+        ("11", "ONLINE"),
+        ("10", "ONLINE"),
+    ]
+    # Every poll lists the whole community, without server side filters
+    assert all("params" not in kwargs for _, kwargs in calls[1:])
+    assert len(calls) == 5
@@ -2,6 +2,7 @@
 # SPDX-FileCopyrightText: 2024 Andrew Grimberg <tykeal@bardicgrove.org>
 """Tests for the Akuvox Communities module."""
 
+import time
 from unittest.mock import MagicMock
 from pyakuvox.communities import Communities
 
@@ -73,3 +74,109 @@ def test_community_has_devices_instance():
     assert isinstance(community._devices, Devices)
     assert community._devices._community_id == 99
     assert community._devices._auth is auth
+
+
+def test_get_communities_stores_listing_in_cache(tmp_path):
+    """Test get_communities writes the listing to the cache."""
+    from pyakuvox.cache import DiskCache
+
+    auth = DummyAuth()
+    cache = DiskCache(tmp_path / "cache.db")
+    auth.requests.return_value = {"data": [{"ID": 7, "Location": "Cached"}]}
+    communities = Communities(auth, cache)
+    communities.get_communities()
+    assert cache.get("communities").payload == [{"ID": 7, "Location": "Cached"}]
+
+    cached = Communities(DummyAuth(), cache).cached_communities()
+    assert [(c.ID, c.Location) for c in cached] == [(7, "Cached")]
+    assert cached[0]._devices._cache is cache
+
+
+def test_get_communities_falls_back_to_cache_on_error(tmp_path):
+    """Test get_communities serves the cached listing when a request fails."""
+    import pytest
+
+    from pyakuvox.cache import DiskCache
+    from pyakuvox.exceptions import UnknownError
+
+    auth = DummyAuth()
+    auth.requests.side_effect = UnknownError("Request failed")
+    cache = DiskCache(tmp_path / "cache.db")
+    communities = Communities(auth, cache)
+    with pytest.raises(UnknownError):
+        communities.get_communities()
+
+    cache.set("communities", [{"ID": 3, "Location": "Stale"}])
+    cache.max_age = 0
+    time.sleep(0.01)
+    result = communities.get_communities()
+    assert [c.ID for c in result] == [3]
+
+
+def test_get_communities_does_not_fall_back_on_login_or_deadline(tmp_path):
+    """Test login failures and exceeded deadlines are not masked by the cache."""
+    import pytest
+
+    from pyakuvox.cache import DiskCache
+    from pyakuvox.exceptions import DeadlineExceededError, NotAuthenticatedError
+
+    cache = DiskCache(tmp_path / "cache.db", max_age=0)
+    cache.set("communities", [{"ID": 3, "Location": "Stale"}])
+    auth = DummyAuth()
+    communities = Communities(auth, cache)
+    for error in (NotAuthenticatedError("denied"), DeadlineExceededError("late")):
+        auth.requests.side_effect = error
+        with pytest.raises(type(error)):
+            communities.get_communities()
+
+
+def test_get_communities_serves_fresh_cache_on_startup(tmp_path):
+    """Test the first listing is served from a fresh cache without a request."""
+    from pyakuvox.cache import DiskCache
+
+    cache = DiskCache(tmp_path / "cache.db")
+    cache.set("communities", [{"ID": 3, "Location": "Cached"}])
+    auth = DummyAuth()
+    auth.requests.return_value = {"data": [{"ID": 4, "Location": "Fresh"}]}
+    communities = Communities(auth, cache)
+    assert [c.Location for c in communities.get_communities()] == ["Cached"]
+    auth.requests.assert_not_called()
+    assert [c.Location for c in communities.get_communities()] == ["Fresh"]
+    auth.requests.assert_called_once()
+
+
+def test_get_communities_revalidates_old_cache(tmp_path):
+    """Test a cached listing older than max_age is fetched again."""
+    from pyakuvox.cache import DiskCache
+
+    cache = DiskCache(tmp_path / "cache.db", max_age=0)
+    cache.set("communities", [{"ID": 3, "Location": "Cached"}])
+    time.sleep(0.01)
+    auth = DummyAuth()
+    auth.requests.return_value = {"data": [{"ID": 4, "Location": "Fresh"}]}
+    assert [c.ID for c in Communities(auth, cache).get_communities()] == [4]
+
+
+def test_cached_communities_without_cache():
+    """Test cached_communities returns None when no cache is configured."""
+    assert Communities(DummyAuth()).cached_communities() is None
+
+
+def test_communities_pass_soft_ttl_to_devices():
+    """Test the soft TTL reaches each community's Devices manager."""
+    auth = DummyAuth()
+    auth.requests.return_value = {"data": [{"ID": 1, "Location": "Loc"}]}
+    result = Communities(auth, soft_ttl=30).get_communities()
+    assert result[0]._devices._soft_ttl == 30
+
+
+def test_get_communities_applies_deadline():
+    """Test get_communities makes its request under the given deadline."""
+    from pyakuvox.deadline import Deadline
+
+    auth = DummyAuth()
+    seen = []
+    auth.requests.side_effect = lambda *a, **k: seen.append(Deadline.current()) or {}
+    Communities(auth).get_communities(deadline=5)
+    assert seen[0] is not None
+    assert seen[0].remaining() <= 5
@@ -0,0 +1,184 @@
+# SPDX-License-Identifier: Apache-2.0
+# SPDX-FileCopyrightText: 2025 Andrew Grimberg <tykeal@bardicgrove.org>
+"""Tests for the Akuvox Deadline module."""
+
+import threading
+from unittest.mock import MagicMock, patch
+
+import pytest
+import requests
+
+from pyakuvox.auth import Auth, _requests
+from pyakuvox.const import RESULT_SUCCESS, SUBDOMAINS_LIST
+from pyakuvox.deadline import Deadline, acquire, within
+from pyakuvox.exceptions import DeadlineExceededError, UnknownError
+
+
+def test_deadline_remaining_and_expired():
+    """Test remaining time is reported and never negative."""
+    deadline = Deadline(10)
+    assert 9 < deadline.remaining() <= 10
+    assert deadline.expired is False
+    assert Deadline(-1).remaining() == 0
+    assert Deadline(-1).expired is True
+
+
+def test_deadline_clamp():
+    """Test request timeouts are shortened to the remaining time."""
+    deadline = Deadline(5)
+    connect, read = deadline.clamp((1, 60))
+    assert connect == 1
+    assert 4 < read <= 5
+    connect, read = deadline.clamp(60)
+    assert 4 < connect <= 5 and connect == read
+    with pytest.raises(DeadlineExceededError):
+        Deadline(0).clamp(60)
+
+
+def test_deadline_context_nesting():
+    """Test nested deadlines never extend the enclosing deadline."""
+    assert Deadline.current() is None
+    with Deadline(5) as outer:
+        assert Deadline.current() is outer
+        with Deadline(60) as inner:
+            assert Deadline.current() is inner
+            assert inner.expires_at == outer.expires_at
+        with Deadline(1) as shorter:
+            assert shorter.expires_at < outer.expires_at
+        assert Deadline.current() is outer
+    assert Deadline.current() is None
+
+
+def test_deadline_exit_without_enter():
+    """Test exiting a deadline that was never entered is harmless."""
+    Deadline(5).__exit__(None, None, None)
+    assert Deadline.current() is None
+
+
+def test_within():
+    """Test within applies a deadline only when seconds are given."""
+    with within(None) as value:
+        assert value is None
+        assert Deadline.current() is None
+    with within(5) as value:
+        assert Deadline.current() is value
+
+
+def test_acquire_waits_within_deadline():
+    """Test lock waits give up when the current deadline passes."""
+    lock = threading.Lock()
+    with acquire(lock):
+        assert lock.locked()
+    assert not lock.locked()
+
+    holder = threading.Thread(target=lock.acquire)
+    holder.start()
+    holder.join()
+    with Deadline(0.05), pytest.raises(DeadlineExceededError) as excinfo:
+        with acquire(lock):
+            pass  # pragma: no cover
+    assert "lock" in str(excinfo.value)
+    lock.release()
+
+
+def test_lock_waits_honour_deadline():
+    """Test logins and device loads stop waiting for other threads in time."""
+    from pyakuvox.devices import Devices
+
+    auth = Auth(SUBDOMAINS_LIST[0], "user", "pass")
+    devices = Devices("1", auth)
+    started = threading.Event()
+    release = threading.Event()
+
+    def hold():
+        """Hold the login and load locks until released."""
+        with auth._lock, devices._load_lock:
+            started.set()
+            release.wait(5)
+
+    holder = threading.Thread(target=hold)
+    holder.start()
+    started.wait(5)
+    try:
+        with pytest.raises(DeadlineExceededError):
+            auth.ensure_authenticated(deadline=0.05)
+        with pytest.raises(DeadlineExceededError):
+            auth.authenticate(deadline=0.05)
+        with Deadline(0.05), pytest.raises(DeadlineExceededError):
+            devices.devices
+    finally:
+        release.set()
+        holder.join()
+
+
+@patch("pyakuvox.auth.requests.request")
+def test__requests_uses_connect_and_read_timeouts(mock_request):
+    """Test _requests defaults to separate connect and read timeouts."""
+    from pyakuvox.const import DEFAULT_CONNECT_TIMEOUT, DEFAULT_READ_TIMEOUT
+
+    mock_request.return_value.json.return_value = {"result": RESULT_SUCCESS}
+    _requests("GET", "http://test")
+    assert mock_request.call_args.kwargs["timeout"] == (
+        DEFAULT_CONNECT_TIMEOUT,
+        DEFAULT_READ_TIMEOUT,
+    )
+
+
+@patch("pyakuvox.auth.requests.request")
+def test__requests_clamps_timeout_to_deadline(mock_request):
+    """Test _requests shortens timeouts to the current deadline."""
+    mock_request.return_value.json.return_value = {"result": RESULT_SUCCESS}
+    with Deadline(2):
+        _requests("GET", "http://test", timeout=(1, 60))
+    connect, read = mock_request.call_args.kwargs["timeout"]
+    assert connect == 1
+    assert read <= 2
+
+
+@patch("pyakuvox.auth.requests.request")
+def test__requests_expired_deadline_skips_request(mock_request):
+    """Test _requests raises without a request once the deadline passed."""
+    with Deadline(0), pytest.raises(DeadlineExceededError):
+        _requests("GET", "http://test")
+    mock_request.assert_not_called()
+
+
+@patch("pyakuvox.auth.requests.request")
+def test__requests_timeout_maps_to_deadline_error(mock_request):
+    """Test a timeout after the deadline passed raises DeadlineExceededError."""
+
+    def time_out(*args, **kwargs):
+        """Expire the deadline and time out."""
+        deadline.expires_at = 0
+        raise requests.Timeout("timed out")
+
+    mock_request.side_effect = time_out
+    with Deadline(5) as deadline, pytest.raises(DeadlineExceededError):
+        _requests("GET", "http://test")
+
+
+@patch("pyakuvox.auth.requests.request")
+def test__requests_timeout_without_deadline(mock_request):
+    """Test a timeout without an expired deadline raises UnknownError."""
+    mock_request.side_effect = requests.Timeout("timed out")
+    with pytest.raises(UnknownError) as excinfo:
+        _requests("GET", "http://test")
+    assert not isinstance(excinfo.value, DeadlineExceededError)
+
+
+@patch("pyakuvox.auth.requests.request")
+def test_auth_requests_deadline_covers_login(mock_request):
+    """Test one deadline bounds both the login and the request."""
+    auth = Auth(SUBDOMAINS_LIST[0], "user", "pass", timeout=(3, 30))
+    response = MagicMock()
+    response.json.return_value = {"result": RESULT_SUCCESS, "token": "t"}
+    mock_request.return_value = response
+
+    auth.requests("GET", "/property/comunityinfo", deadline=10)
+
+    assert mock_request.call_count == 2
+    for call in mock_request.call_args_list:
+        connect, read = call.kwargs["timeout"]
+        assert connect == 3
+        assert read <= 10
+    assert Deadline.current() is None
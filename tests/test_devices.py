@@ -2,8 +2,26 @@
 # SPDX-FileCopyrightText: 2024 Andrew Grimberg <tykeal@bardicgrove.org>
 """Tests for the Akuvox Devices module."""
 
+import pickle
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from unittest.mock import MagicMock
+
+import pytest
+
+from pyakuvox.auth import Auth
+from pyakuvox.cache import DiskCache
+from pyakuvox.const import SUBDOMAINS_LIST
+from pyakuvox.deadline import Deadline
 from pyakuvox.devices import Device, Devices, DEVICE_TYPE, DEVICE_STATUS
+from pyakuvox.exceptions import (
+    CircuitOpenError,
+    DeadlineExceededError,
+    NotAuthenticatedError,
+    RequestFailedError,
+    UnknownError,
+)
 
 
 class DummyAuth:
@@ -254,3 +272,367 @@ def test_devices_type_properties_with_no_devices():
     assert devices.door_phones == []
     assert devices.indoor_monitors == []
     assert devices.stair_phones == []
+
+
+def test_devices_served_from_cache_without_request(tmp_path):
+    """Test the devices property serves a cached listing without a request."""
+    cache = DiskCache(tmp_path / "cache.db")
+    cache.set("devices/42", [{"ID": 9, "Name": "Cached"}])
+    auth = DummyAuth()
+    devices = Devices("42", auth, cache)
+    assert [d.Name for d in devices.devices] == ["Cached"]
+    auth.requests.assert_not_called()
+
+
+def test_devices_get_devices_stores_listing_in_cache(tmp_path):
+    """Test get_devices writes the listing rows to the cache."""
+    cache = DiskCache(tmp_path / "cache.db")
+    auth = DummyAuth()
+    auth.requests.return_value = {"data": {"row": [{"ID": 1, "Name": "Door"}]}}
+    devices = Devices("42", auth, cache)
+    devices.get_devices()
+    assert cache.get("devices/42").payload == [{"ID": 1, "Name": "Door"}]
+
+
+def test_devices_get_devices_falls_back_to_cache_on_error(tmp_path):
+    """Test get_devices loads the cached listing when a request fails."""
+    cache = DiskCache(tmp_path / "cache.db")
+    auth = DummyAuth()
+    auth.requests.side_effect = UnknownError("Request failed")
+    devices = Devices("42", auth, cache)
+    with pytest.raises(UnknownError):
+        devices.get_devices()
+
+    cache.set("devices/42", [{"ID": 5, "Name": "Stale"}])
+    devices.get_devices()
+    assert [d.Name for d in devices._devices] == ["Stale"]
+
+
+def test_devices_get_devices_does_not_fall_back_on_login_or_deadline(tmp_path):
+    """Test login failures and exceeded deadlines are not masked by the cache."""
+    cache = DiskCache(tmp_path / "cache.db")
+    cache.set("devices/42", [{"ID": 5, "Name": "Stale"}])
+    auth = DummyAuth()
+    devices = Devices("42", auth, cache)
+    for error in (NotAuthenticatedError("denied"), DeadlineExceededError("late")):
+        auth.requests.side_effect = error
+        with pytest.raises(type(error)):
+            devices.get_devices()
+    assert devices._checked_at is None
+
+
+def test_devices_old_cache_is_revalidated(tmp_path):
+    """Test a cached listing older than max_age is not served as is."""
+    cache = DiskCache(tmp_path / "cache.db", max_age=0)
+    cache.set("devices/42", [{"ID": 9, "Name": "Cached"}])
+    time.sleep(0.01)
+    auth = DummyAuth()
+    auth.requests.return_value = {"data": {"row": [{"ID": 9, "Name": "Fresh"}]}}
+    devices = Devices("42", auth, cache)
+    assert [d.Name for d in devices.devices] == ["Fresh"]
+    auth.requests.assert_called_once()
+
+
+def test_devices_soft_ttl_returns_immediately_and_refreshes():
+    """Test reads with a soft TTL never block and refresh in the background."""
+    auth = DummyAuth()
+    release = threading.Event()
+
+    def slow_request(*args, **kwargs):
+        """Answer once the test releases the request."""
+        release.wait(5)
+        return {"data": {"row": [{"ID": 1, "Name": "Door"}]}}
+
+    auth.requests.side_effect = slow_request
+    devices = Devices("1", auth, soft_ttl=60)
+    assert devices.is_stale is True
+    assert devices.devices == []
+    assert devices.is_refreshing is True
+    # Concurrent reads share the running refresh
+    assert devices.devices == []
+    release.set()
+    assert devices.wait_for_refresh(5) is True
+    assert [d.Name for d in devices.devices] == ["Door"]
+    assert devices.is_stale is False
+    assert devices.refresh_error is None
+    auth.requests.assert_called_once()
+
+
+def test_devices_soft_ttl_refreshes_stale_list(monkeypatch):
+    """Test a list older than the soft TTL is refreshed on read."""
+    auth = DummyAuth()
+    auth.requests.return_value = {"data": {"row": [{"ID": 1}]}}
+    devices = Devices("1", auth, soft_ttl=10)
+    devices.get_devices()
+    assert devices.is_stale is False
+    devices._checked_at -= 11
+    assert devices.is_stale is True
+    auth.requests.return_value = {"data": {"row": [{"ID": 2}]}}
+    assert [d.ID for d in devices.devices] == ["1"]
+    devices.wait_for_refresh(5)
+    assert [d.ID for d in devices.devices] == ["2"]
+
+
+def test_devices_soft_ttl_serves_cached_listing(tmp_path):
+    """Test a soft TTL read serves the cache and revalidates if it is old."""
+    cache = DiskCache(tmp_path / "cache.db")
+    cache.set("devices/1", [{"ID": 1, "Name": "Cached"}])
+    auth = DummyAuth()
+    auth.requests.return_value = {"data": {"row": [{"ID": 1, "Name": "Fresh"}]}}
+    devices = Devices("1", auth, cache, soft_ttl=3600)
+    assert [d.Name for d in devices.devices] == ["Cached"]
+    assert devices.is_refreshing is False
+    auth.requests.assert_not_called()
+
+
+def test_devices_soft_ttl_refresh_error_keeps_list():
+    """Test a failed background refresh is exposed without breaking reads."""
+    auth = DummyAuth()
+    auth.requests.return_value = {"data": {"row": [{"ID": 1}]}}
+    devices = Devices("1", auth, soft_ttl=10)
+    devices.get_devices()
+    devices._checked_at -= 11
+    error = UnknownError("Request failed")
+    auth.requests.side_effect = error
+    assert [d.ID for d in devices.devices] == ["1"]
+    devices.wait_for_refresh(5)
+    assert devices.refresh_error is error
+    assert devices.is_stale is False
+    assert [d.ID for d in devices.devices] == ["1"]
+
+
+def test_devices_soft_ttl_refresh_records_unexpected_errors():
+    """Test errors other than API errors are recorded by a refresh too."""
+    auth = DummyAuth()
+    auth.requests.return_value = {"data": {"row": [{"ID": 1}]}}
+    devices = Devices("1", auth, soft_ttl=10)
+    devices.get_devices()
+    devices._checked_at -= 11
+    auth.requests.return_value = {"data": {"row": [{"ID": 2, "Type": "9"}]}}
+    assert [d.ID for d in devices.devices] == ["1"]
+    devices.wait_for_refresh(5)
+    assert isinstance(devices.refresh_error, ValueError)
+    assert devices.is_stale is False
+    assert [d.ID for d in devices.devices] == ["1"]
+
+
+def test_devices_without_soft_ttl_is_never_stale_once_loaded():
+    """Test is_stale without a soft TTL only reports unloaded lists."""
+    auth = DummyAuth()
+    auth.requests.return_value = {"data": {"row": []}}
+    devices = Devices("1", auth)
+    assert devices.is_stale is True
+    assert devices.wait_for_refresh() is True
+    devices.get_devices()
+    assert devices.is_stale is False
+
+
+def test_devices_get_devices_applies_deadline():
+    """Test get_devices makes its request under the given deadline."""
+    auth = DummyAuth()
+    seen = []
+    auth.requests.side_effect = lambda *a, **k: seen.append(Deadline.current()) or {}
+    Devices("1", auth).get_devices(deadline=5)
+    assert seen[0] is not None
+    assert seen[0].remaining() <= 5
+
+
+def test_devices_single_fetch_under_concurrency():
+    """Test 64 threads reading devices share one fetch and one list."""
+    threads = 64
+    auth = DummyAuth()
+
+    def slow_request(*args, **kwargs):
+        """Answer slowly so the reads overlap."""
+        time.sleep(0.05)
+        return {"data": {"row": [{"ID": 1, "Type": "1"}, {"ID": 2, "Type": "2"}]}}
+
+    auth.requests.side_effect = slow_request
+    devices = Devices("1", auth)
+    barrier = threading.Barrier(threads)
+
+    def worker(_):
+        """Read the devices once all threads are ready."""
+        barrier.wait()
+        return devices.devices
+
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        results = list(executor.map(worker, range(threads)))
+
+    auth.requests.assert_called_once()
+    assert all(result is results[0] for result in results)
+    assert [d.ID for d in results[0]] == ["1", "2"]
+
+
+def test_devices_empty_listing_is_not_refetched():
+    """Test an empty listing counts as loaded and is not fetched again."""
+    auth = DummyAuth()
+    auth.requests.return_value = {"data": {"row": []}}
+    devices = Devices("1", auth)
+    assert devices.devices == []
+    assert devices.devices == []
+    auth.requests.assert_called_once()
+
+
+def test_devices_pickle_round_trip():
+    """Test pickled Devices keep their list and drop locks and threads."""
+    auth = Auth(SUBDOMAINS_LIST[0], "user", "pass")
+    auth._token = "fake-token"
+    devices = Devices("1", auth, soft_ttl=60)
+    devices._load_rows([{"ID": 1, "Name": "Door", "Type": "1"}])
+    devices._refresh_thread = MagicMock()
+    restored = pickle.loads(pickle.dumps(devices))
+    assert [(d.ID, d.Name, d.Type) for d in restored._devices] == [
+        ("1", "Door", DEVICE_TYPE.DOOR_PHONE)
+    ]
+    assert restored._auth.token == "fake-token"
+    assert restored._refresh_thread is None
+    assert restored.is_refreshing is False
+    assert restored._load_lock.acquire(blocking=False)
+
+
+QUERY_ROWS = [
+    {"ID": 1, "Name": "Front Door", "Type": "1", "Status": "0", "UnitName": "A"},
+    {"ID": 2, "Name": "Back Door", "Type": "1", "Status": "1", "UnitName": "B"},
+    {"ID": 3, "Name": "Lobby", "Type": "2", "Status": "0", "MAC": "0C:11:05:AA"},
+]
+
+
+def test_devices_query_uses_server_filters_when_honoured():
+    """Test query sends filters to the API and keeps using them if honoured."""
+    auth = DummyAuth()
+    auth.requests.return_value = {"data": {"row": [QUERY_ROWS[0]]}}
+    devices = Devices("1", auth)
+
+    result = devices.query(
+        device_type=DEVICE_TYPE.DOOR_PHONE, status=DEVICE_STATUS.OFFLINE
+    )
+    assert [d.ID for d in result] == ["1"]
+    assert devices.server_filters is True
+    auth.requests.assert_called_once_with(
+        "GET",
+        "/property/selectdevice",
+        headers={"x-community-id": "1"},
+        params={"Type": "1", "Status": "0"},
+    )
+    assert devices._checked_at is None
+
+    # A search is applied locally, only the unit is sent
+    assert [d.ID for d in devices.query(unit_name="A", search="FRONT")] == ["1"]
+    assert [d.ID for d in devices.query(unit_name="A", search="back")] == []
+    assert auth.requests.call_args.kwargs["params"] == {"UnitName": "A"}
+
+
+def test_devices_type_properties_load_list_once():
+    """Test type properties share one listing instead of filtered requests."""
+    auth = DummyAuth()
+    auth.requests.return_value = {"data": {"row": QUERY_ROWS}}
+    devices = Devices("1", auth)
+    for _ in range(3):
+        assert [d.ID for d in devices.door_phones] == ["1", "2"]
+        assert [d.ID for d in devices.indoor_monitors] == ["3"]
+        assert devices.stair_phones == []
+    auth.requests.assert_called_once_with(
+        "GET", "/property/selectdevice", headers={"x-community-id": "1"}
+    )
+
+
+def test_devices_query_falls_back_when_filters_ignored(tmp_path):
+    """Test an ignored single filter switches to local filtering."""
+    auth = DummyAuth()
+    auth.requests.return_value = {"data": {"row": QUERY_ROWS}}
+    cache = DiskCache(tmp_path / "cache.db")
+    devices = Devices("1", auth, cache)
+
+    assert [d.ID for d in devices.query(status=DEVICE_STATUS.OFFLINE)] == ["1", "3"]
+    assert devices.server_filters is False
+    # The ignored filter returned the full listing, which is now loaded
+    assert [d.ID for d in devices._devices] == ["1", "2", "3"]
+    assert cache.get("devices/1").payload == QUERY_ROWS
+    assert [d.ID for d in devices.query(search="0c:11")] == ["3"]
+    auth.requests.assert_called_once()
+
+
+def test_devices_query_multiple_ignored_filters_not_loaded():
+    """Test a mismatch with several filters does not load a partial list."""
+    auth = DummyAuth()
+    auth.requests.return_value = {"data": {"row": QUERY_ROWS[:2]}}
+    devices = Devices("1", auth)
+    result = devices.query(device_type=DEVICE_TYPE.DOOR_PHONE, unit_name="B")
+    assert [d.ID for d in result] == ["2"]
+    assert devices.server_filters is False
+    assert devices._checked_at is None
+
+    auth.requests.return_value = {"data": {"row": QUERY_ROWS}}
+    assert [d.ID for d in devices.query(search="door")] == ["1", "2"]
+    assert "params" not in auth.requests.call_args.kwargs
+
+
+def test_devices_query_without_filters_returns_all():
+    """Test query without filters returns the full device list."""
+    auth = DummyAuth()
+    auth.requests.return_value = {"data": {"row": QUERY_ROWS}}
+    devices = Devices("1", auth)
+    assert len(devices.query()) == 3
+    assert devices.server_filters is None
+
+
+def test_devices_query_rejected_filters_fall_back_to_local():
+    """Test filters rejected by the API switch to local filtering."""
+    auth = DummyAuth()
+
+    def reject_filters(*args, **kwargs):
+        """Reject filtered listings and answer the full listing."""
+        if "params" in kwargs:
+            raise RequestFailedError("400 Client Error")
+        return {"data": {"row": QUERY_ROWS}}
+
+    auth.requests.side_effect = reject_filters
+    devices = Devices("1", auth)
+    assert [d.ID for d in devices.query(status=DEVICE_STATUS.OFFLINE)] == ["1", "3"]
+    assert devices.server_filters is False
+    assert [d.ID for d in devices.query(unit_name="B")] == ["2"]
+    assert auth.requests.call_count == 2
+
+
+@pytest.mark.parametrize(
+    "error",
+    [
+        NotAuthenticatedError("denied"),
+        DeadlineExceededError("late"),
+        CircuitOpenError("open"),
+    ],
+)
+def test_devices_query_probe_does_not_mask_errors(error):
+    """Test login, deadline and circuit errors are raised by the probe."""
+    auth = DummyAuth()
+    auth.requests.side_effect = error
+    devices = Devices("1", auth)
+    with pytest.raises(type(error)):
+        devices.query(status=DEVICE_STATUS.ONLINE)
+    assert devices.server_filters is None
+
+
+def test_devices_query_errors_after_probe_are_raised():
+    """Test request failures are raised once server filters are proven."""
+    auth = DummyAuth()
+    auth.requests.return_value = {"data": {"row": [QUERY_ROWS[1]]}}
+    devices = Devices("1", auth)
+    devices.query(status=DEVICE_STATUS.ONLINE)
+    assert devices.server_filters is True
+    auth.requests.side_effect = RequestFailedError("down")
+    with pytest.raises(RequestFailedError):
+        devices.query(status=DEVICE_STATUS.ONLINE)
+    assert devices.server_filters is True
+
+
+def test_devices_query_empty_result_leaves_probe_undecided():
+    """Test an empty filtered listing does not prove the filters work."""
+    auth = DummyAuth()
+    auth.requests.return_value = {"data": {"row": []}}
+    devices = Devices("1", auth)
+    assert devices.query(unit_name="missing") == []
+    assert devices.server_filters is None
+    auth.requests.return_value = {"data": {"row": QUERY_ROWS}}
+    assert [d.ID for d in devices.query(unit_name="A")] == ["1"]
+    assert devices.server_filters is False
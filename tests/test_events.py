@@ -0,0 +1,172 @@
+# SPDX-License-Identifier: Apache-2.0
+# SPDX-FileCopyrightText: 2025 Andrew Grimberg <tykeal@bardicgrove.org>
+"""Tests for the Akuvox event bus module."""
+
+import asyncio
+import pickle
+import threading
+from unittest.mock import patch
+
+import pytest
+
+from pyakuvox.api import Akuvox
+from pyakuvox.auth import Auth
+from pyakuvox.const import RESULT_SUCCESS, SUBDOMAINS_LIST
+from pyakuvox.events import EVENT_TYPE, Event, EventBus
+
+
+def test_subscribe_and_unsubscribe():
+    """Test callbacks receive matching events until unsubscribed."""
+    bus = EventBus()
+    received = []
+    devices_only = []
+    unsubscribe = bus.subscribe(received.append)
+    bus.subscribe(devices_only.append, EVENT_TYPE.DEVICES_CHANGED)
+    assert bus.has_subscribers is True
+
+    event = Event(EVENT_TYPE.COMMUNITIES_CHANGED, [])
+    bus.emit(event)
+    assert received == [event]
+    assert devices_only == []
+
+    unsubscribe()
+    unsubscribe()
+    bus.emit(Event(EVENT_TYPE.DEVICES_CHANGED, [], "1"))
+    assert received == [event]
+    assert len(devices_only) == 1
+
+
+def test_callback_errors_are_logged(caplog):
+    """Test a failing callback does not stop other subscribers."""
+    bus = EventBus()
+    received = []
+
+    def broken(event):
+        """Fail on every event."""
+        raise RuntimeError("boom")
+
+    bus.subscribe(broken)
+    bus.subscribe(received.append)
+    bus.emit(Event(EVENT_TYPE.AUTHENTICATED, None))
+    assert len(received) == 1
+    assert "Error in event callback" in caplog.text
+
+
+def test_bus_pickles_without_subscribers():
+    """Test a pickled bus comes back empty."""
+    bus = EventBus()
+    bus.subscribe(print)
+    restored = pickle.loads(pickle.dumps(bus))
+    assert restored.has_subscribers is False
+
+
+def test_stream_requires_running_loop():
+    """Test creating a stream outside an event loop raises."""
+    with pytest.raises(RuntimeError):
+        EventBus().stream()
+
+
+def test_stream_receives_events_from_threads():
+    """Test the async stream yields events published from other threads."""
+    bus = EventBus()
+
+    async def consume():
+        """Wait for the first matching event."""
+        with bus.stream(EVENT_TYPE.DEVICES_CHANGED) as stream:
+            worker = threading.Thread(
+                target=lambda: [
+                    bus.emit(Event(EVENT_TYPE.AUTHENTICATED, None)),
+                    bus.emit(Event(EVENT_TYPE.DEVICES_CHANGED, ["a"], "1")),
+                ]
+            )
+            worker.start()
+            event = await asyncio.wait_for(anext(aiter(stream)), 5)
+            worker.join()
+        assert bus.has_subscribers is False
+        return event
+
+    event = asyncio.run(consume())
+    assert event == Event(EVENT_TYPE.DEVICES_CHANGED, ["a"], "1")
+
+
+def test_closing_stream_ends_iteration():
+    """Test closing a stream ends a waiting async for loop."""
+    bus = EventBus()
+
+    async def consume():
+        """Collect events until the stream is closed from another thread."""
+        stream = bus.stream()
+        received = []
+
+        def publish_and_close():
+            """Publish one event, then close the stream."""
+            bus.emit(Event(EVENT_TYPE.AUTHENTICATED, None))
+            stream.close()
+
+        worker = threading.Thread(target=publish_and_close)
+        worker.start()
+        async for event in stream:
+            received.append(event.type)
+        worker.join()
+        # The ended stream stays ended and closing again is harmless
+        stream.close()
+        assert [event async for event in stream] == []
+        return received
+
+    received = asyncio.run(asyncio.wait_for(consume(), 5))
+    assert received == [EVENT_TYPE.AUTHENTICATED]
+    assert bus.has_subscribers is False
+
+
+def test_closing_stream_after_loop_closed():
+    """Test a stream can be closed after its event loop has finished."""
+    bus = EventBus()
+
+    async def create():
+        """Create a stream on the running loop."""
+        return bus.stream()
+
+    stream = asyncio.run(create())
+    stream.close()
+    assert bus.has_subscribers is False
+
+
+@patch("pyakuvox.auth._requests")
+def test_akuvox_publishes_changes(mock__requests):
+    """Test logins and changed listings are published on Akuvox.events."""
+    listings = {
+        "/property/comunityinfo": {"data": [{"ID": "1", "Location": "Here"}]},
+        "/property/selectdevice": {"data": {"row": [{"ID": 5}]}},
+    }
+
+    def fake_requests(method, url, **kwargs):
+        """Answer the login and the listings."""
+        if url.endswith("/property/login"):
+            return {"result": RESULT_SUCCESS, "token": "t"}
+        return listings[url.split(".com", 1)[1]]
+
+    mock__requests.side_effect = fake_requests
+    akuvox = Akuvox(Auth(SUBDOMAINS_LIST[0], "user", "pass"))
+    received = []
+    akuvox.events.subscribe(received.append)
+
+    communities = akuvox.communities.get_communities()
+    communities[0].devices
+    # Unchanged listings publish nothing
+    akuvox.communities.get_communities()
+    communities[0].load_devices(refresh=True)
+
+    assert [e.type for e in received] == [
+        EVENT_TYPE.AUTHENTICATED,
+        EVENT_TYPE.COMMUNITIES_CHANGED,
+        EVENT_TYPE.DEVICES_CHANGED,
+    ]
+    assert received[0].data is akuvox.auth
+    assert [c.ID for c in received[1].data] == ["1"]
+    assert received[2].community_id == "1"
+    assert [d.ID for d in received[2].data] == ["5"]
+
+    listings["/property/selectdevice"] = {"data": {"row": [{"ID": 6}]}}
+    communities[0].load_devices(refresh=True)
+    assert received[-1].type == EVENT_TYPE.DEVICES_CHANGED
+    assert [d.ID for d in received[-1].data] == ["6"]
@@ -0,0 +1,64 @@
+# SPDX-License-Identifier: Apache-2.0
+# SPDX-FileCopyrightText: 2025 Andrew Grimberg <tykeal@bardicgrove.org>
+"""Tests for the Akuvox fork safety helpers."""
+
+import multiprocessing
+import threading
+
+from pyakuvox import _forksafe
+from pyakuvox.auth import Auth
+from pyakuvox.const import SUBDOMAINS_LIST
+
+
+class Tracked:
+    """Object counting lock resets."""
+
+    def __init__(self):
+        """Initialize the reset counter."""
+        self.resets = 0
+
+    def _reset_locks(self):
+        """Count a reset."""
+        self.resets += 1
+
+
+def test_after_fork_resets_tracked_objects():
+    """Test the fork handler resets every tracked object."""
+    obj = Tracked()
+    _forksafe.track(obj)
+    _forksafe._after_fork_in_child()
+    assert obj.resets == 1
+
+
+def _acquire_login_lock(auth, queue):
+    """Report whether the login lock can be taken in a child process."""
+    acquired = auth._lock.acquire(timeout=5)
+    queue.put((acquired, auth.token))
+
+
+def test_forked_child_gets_fresh_locks():
+    """Test a lock held in the parent at fork time is free in the child."""
+    auth = Auth(SUBDOMAINS_LIST[0], "user", "pass")
+    auth._token = "parent-token"
+    holding = threading.Event()
+    release = threading.Event()
+
+    def hold_lock():
+        """Hold the login lock until released."""
+        with auth._lock:
+            holding.set()
+            release.wait(10)
+
+    holder = threading.Thread(target=hold_lock)
+    holder.start()
+    holding.wait(5)
+    try:
+        context = multiprocessing.get_context("fork")
+        queue = context.Queue()
+        child = context.Process(target=_acquire_login_lock, args=(auth, queue))
+        child.start()
+        assert queue.get(timeout=10) == (True, "parent-token")
+        child.join(10)
+    finally:
+        release.set()
+        holder.join()
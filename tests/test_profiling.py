@@ -0,0 +1,152 @@
+# SPDX-License-Identifier: Apache-2.0
+# SPDX-FileCopyrightText: 2025 Andrew Grimberg <tykeal@bardicgrove.org>
+"""Tests for the Akuvox profiling module."""
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from pyakuvox import _forksafe
+from pyakuvox.api import Akuvox
+from pyakuvox.auth import Auth
+from pyakuvox.const import RESULT_SUCCESS, SUBDOMAINS_LIST
+from pyakuvox.profiling import PROFILE_ENV, PROFILER, Profiler, _requested
+from pyakuvox.profiling import profiled
+
+
+@pytest.fixture
+def global_profiler():
+    """Return the process profiler, disabled and emptied afterwards."""
+    yield PROFILER
+    PROFILER.disable()
+    PROFILER.reset()
+
+
+def test_disabled_profiler_records_nothing():
+    """Test nothing is recorded while the profiler is disabled."""
+    profiler = Profiler()
+    with profiler.operation("op"):
+        with profiler.section("network"):
+            pass
+    assert profiler.stats() == []
+    assert profiler.collapsed() == ""
+
+
+def test_sections_are_recorded_per_operation():
+    """Test sections count towards the outermost operation."""
+    profiler = Profiler(enabled=True)
+    with profiler.operation("outer"):
+        with profiler.section("network"):
+            pass
+        with profiler.operation("inner"):
+            with profiler.section("network"):
+                pass
+            with profiler.section("json_decode"):
+                pass
+    with profiler.section("build_objects"):
+        pass
+
+    rows = {(op, section): calls for op, section, calls, _, _ in profiler.stats()}
+    assert rows == {
+        ("<none>", "build_objects"): 1,
+        ("outer", "total"): 1,
+        ("outer", "self"): 1,
+        ("outer", "network"): 2,
+        ("outer", "json_decode"): 1,
+    }
+    for _, _, _, wall, cpu in profiler.stats():
+        assert wall >= 0
+        assert cpu >= 0
+
+    profiler.reset()
+    assert profiler.stats() == []
+
+
+def test_summary_and_collapsed_output(tmp_path):
+    """Test the summary table and the flamegraph collapsed stacks."""
+    profiler = Profiler(enabled=True)
+    profiler._add(profiler._totals, "op", 0.003, 0.001)
+    profiler._add(profiler._sections, ("op", "network"), 0.002, 0.0)
+
+    summary = profiler.summary().splitlines()
+    assert summary[0].split() == ["operation", "section", "calls", "wall", "ms"] + [
+        "cpu",
+        "ms",
+    ]
+    assert summary[1].split() == ["op", "total", "1", "3.000", "1.000"]
+    assert summary[2].split() == ["op", "self", "1", "1.000", "1.000"]
+    assert summary[3].split() == ["op", "network", "1", "2.000", "0.000"]
+
+    assert profiler.collapsed() == "op 1000\nop;network 2000\n"
+    path = tmp_path / "profile.folded"
+    profiler.write_collapsed(path, cpu=True)
+    assert path.read_text() == "op 1000\n"
+
+
+def test_profiled_decorator(global_profiler):
+    """Test the decorator records an operation only while enabled."""
+
+    @profiled("Thing.call")
+    def call(value):
+        """Return the value."""
+        return value
+
+    assert call(1) == 1
+    assert global_profiler.stats() == []
+    global_profiler.enable()
+    assert call(2) == 2
+    assert [row[:3] for row in global_profiler.stats()] == [
+        ("Thing.call", "total", 1),
+        ("Thing.call", "self", 1),
+    ]
+
+
+def test_fork_resets_lock():
+    """Test a forked child gets a new lock, even if the parent held it."""
+    profiler = Profiler(enabled=True)
+    assert profiler in _forksafe._TRACKED
+    assert PROFILER in _forksafe._TRACKED
+    profiler._lock.acquire()
+    _forksafe._after_fork_in_child()
+    assert not profiler._lock.locked()
+    with profiler.operation("op"):
+        pass
+    assert profiler.stats()[0][:3] == ("op", "total", 1)
+
+
+def test_requested_from_environment(monkeypatch):
+    """Test profiling is requested by the environment variable."""
+    monkeypatch.delenv(PROFILE_ENV, raising=False)
+    assert not _requested()
+    monkeypatch.setenv(PROFILE_ENV, "1")
+    assert _requested()
+    monkeypatch.setenv(PROFILE_ENV, "off")
+    assert not _requested()
+
+
+def test_akuvox_profile_records_api_sections(global_profiler):
+    """Test a profiled client records network, decode, checks and builds."""
+    auth = Auth(SUBDOMAINS_LIST[0], "user", "pass")
+    auth._token = "fake-token"
+    akuvox = Akuvox(auth, profile=True)
+    assert akuvox.profiler is global_profiler
+    assert global_profiler.enabled
+
+    response = MagicMock()
+    response.json.return_value = {"result": RESULT_SUCCESS, "data": [{"ID": 1}]}
+    with patch("pyakuvox.auth.requests.request", return_value=response):
+        akuvox.communities.get_communities()
+
+    sections = {
+        section: calls
+        for op, section, calls, _, _ in global_profiler.stats()
+        if op == "Communities.get_communities"
+    }
+    assert sections == {
+        "total": 1,
+        "self": 1,
+        "network": 1,
+        "json_decode": 1,
+        "result_check": 1,
+        "build_objects": 1,
+    }
@@ -0,0 +1,87 @@
+# SPDX-License-Identifier: Apache-2.0
+# SPDX-FileCopyrightText: 2025 Andrew Grimberg <tykeal@bardicgrove.org>
+"""Tests for the Akuvox StringPool module."""
+
+import pickle
+
+from pyakuvox import _forksafe
+from pyakuvox.devices import Device, Devices
+from pyakuvox.strings import StringPool
+
+
+def distinct(value):
+    """Return an equal string that is a different object."""
+    return "".join(list(value))
+
+
+def test_intern_returns_shared_instance():
+    """Test equal strings are replaced by one shared instance."""
+    pool = StringPool()
+    first = pool.intern(distinct("Building 1"))
+    second = pool.intern(distinct("Building 1"))
+    assert first == second == "Building 1"
+    assert first is second
+    assert len(pool) == 1
+
+
+def test_pool_is_bounded():
+    """Test the pool starts over once it reaches its maximum size."""
+    pool = StringPool(max_size=2)
+    pool.intern("a")
+    pool.intern("b")
+    assert len(pool) == 2
+    pool.intern("c")
+    assert len(pool) == 1
+
+
+def test_pool_pickles_empty():
+    """Test a pickled pool keeps its size but not its strings."""
+    pool = StringPool(max_size=10)
+    pool.intern("a")
+    restored = pickle.loads(pickle.dumps(pool))
+    assert restored.max_size == 10
+    assert len(restored) == 0
+
+
+def test_fork_resets_lock():
+    """Test a forked child gets a new lock, even if the parent held it."""
+    pool = StringPool()
+    assert pool in _forksafe._TRACKED
+    pool._lock.acquire()
+    _forksafe._after_fork_in_child()
+    assert not pool._lock.locked()
+    assert pool.intern("a") == "a"
+    restored = pickle.loads(pickle.dumps(pool))
+    assert restored in _forksafe._TRACKED
+
+
+def test_devices_share_pooled_strings():
+    """Test devices built through a pool share repeated field values."""
+
+    class DummyAuth:
+        """Dummy Auth returning two devices with equal field values."""
+
+        def requests(self, *args, **kwargs):
+            """Return rows whose strings are distinct objects."""
+            return {
+                "data": {
+                    "row": [
+                        {
+                            "ID": i,
+                            "UnitName": distinct("Unit 1"),
+                            "RoomName": distinct("Room 1"),
+                            "Location": distinct("Lobby"),
+                            "VersionNumber": distinct("1.2.3"),
+                        }
+                        for i in range(2)
+                    ]
+                }
+            }
+
+    pool = StringPool()
+    devices = Devices("1", DummyAuth(), pool=pool).devices
+    for field in ("UnitName", "RoomName", "Location", "VersionNumber", "Relay"):
+        assert getattr(devices[0], field) is getattr(devices[1], field)
+    unpooled = Device({"UnitName": distinct("Unit 1")})
+    assert unpooled.UnitName == devices[0].UnitName
+    assert unpooled.UnitName is not devices[0].UnitName
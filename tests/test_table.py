@@ -0,0 +1,168 @@
+# SPDX-License-Identifier: Apache-2.0
+# SPDX-FileCopyrightText: 2025 Andrew Grimberg <tykeal@bardicgrove.org>
+"""Tests for the Akuvox DeviceTable module."""
+
+from unittest.mock import MagicMock
+
+import pytest
+from pyakuvox.communities import Community
+from pyakuvox.devices import Device, DEVICE_STATUS, DEVICE_TYPE
+from pyakuvox.table import COLUMNS, DeviceTable
+
+
+class DummyCommunity:
+    """Dummy Community class for testing DeviceTable."""
+
+    def __init__(self, community_id, rows):
+        """Initialize the dummy community with devices built from rows."""
+        self.ID = community_id
+        self.devices = [Device(row) for row in rows]
+
+    def load_devices(self):
+        """Return the devices, which are always loaded."""
+        return self.devices
+
+
+def make_table():
+    """Build a table with two communities."""
+    return DeviceTable.from_communities(
+        [
+            DummyCommunity(
+                1,
+                [
+                    {"ID": 1, "Type": "1", "Status": "1", "UnitName": "A"},
+                    {"ID": 2, "Type": "1", "Status": "0", "UnitName": "A"},
+                    {"ID": 3, "Type": "2", "Status": "1", "UnitName": "B"},
+                ],
+            ),
+            DummyCommunity(
+                2,
+                [
+                    {"ID": 4, "Type": "0", "Status": "1", "VersionNumber": "1.0"},
+                    {"ID": 5, "Type": "1", "Status": "1", "VersionNumber": "2.0"},
+                ],
+            ),
+        ]
+    )
+
+
+def test_from_communities_waits_with_soft_ttl():
+    """Test communities with a soft TTL are loaded before building."""
+    auth = MagicMock()
+    auth.requests.return_value = {"data": {"row": [{"ID": 1}, {"ID": 2}]}}
+    community = Community({"ID": 1}, auth, soft_ttl=60)
+    table = DeviceTable.from_communities([community])
+    assert table.column("ID") == ["1", "2"]
+    assert not community._devices.is_refreshing
+
+
+def test_empty_table():
+    """Test an empty table has no rows."""
+    table = DeviceTable()
+    assert len(table) == 0
+    assert table.count(Type=DEVICE_TYPE.DOOR_PHONE) == 0
+    assert table.group_count("Status") == {}
+    assert list(table.rows()) == []
+
+
+def test_from_communities_builds_rows():
+    """Test from_communities appends every device with its community ID."""
+    table = make_table()
+    assert len(table) == 5
+    assert table.column("CommunityID") == [1, 1, 1, 2, 2]
+    assert table.column("ID") == ["1", "2", "3", "4", "5"]
+    row = next(table.rows())
+    assert set(row) == set(COLUMNS)
+    assert row["Type"] == DEVICE_TYPE.DOOR_PHONE
+
+
+def test_filter_and_count():
+    """Test filters combine and count matching rows."""
+    table = make_table()
+    assert table.count(Type=DEVICE_TYPE.DOOR_PHONE) == 3
+    assert table.count(Type="1", Status=DEVICE_STATUS.ONLINE) == 2
+    assert table.count(Type=DEVICE_TYPE.INDOOR_MONITOR, CommunityID=2) == 0
+    assert table.count(Type=[DEVICE_TYPE.STAIR_PHONE, DEVICE_TYPE.INDOOR_MONITOR]) == 2
+    assert table.count(UnitName="missing") == 0
+
+    online = table.filter(Status=DEVICE_STATUS.ONLINE)
+    assert online.column("ID") == ["1", "3", "4", "5"]
+    assert online.count(CommunityID=1) == 2
+    assert online.filter().column("ID") == online.column("ID")
+
+
+def test_group_count():
+    """Test group_count counts rows per value, honouring filters."""
+    table = make_table()
+    assert table.group_count("CommunityID") == {1: 3, 2: 2}
+    online = table.filter(Status=DEVICE_STATUS.ONLINE)
+    assert online.group_count("CommunityID") == {1: 2, 2: 2}
+    assert table.group_count("UnitName") == {"A": 2, "B": 1, "": 2}
+
+
+def test_group_count_high_cardinality(monkeypatch):
+    """Test group_count falls back to counting codes for many values."""
+    monkeypatch.setattr("pyakuvox.table._MASK_GROUP_LIMIT", 1)
+    table = make_table()
+    assert table.group_count("VersionNumber") == {"": 3, "1.0": 1, "2.0": 1}
+    online = table.filter(Status=DEVICE_STATUS.ONLINE)
+    assert online.group_count("VersionNumber") == {"": 2, "1.0": 1, "2.0": 1}
+
+
+def test_strings_are_shared():
+    """Test repeated values are stored once and shared between rows."""
+    table = DeviceTable()
+    unit = "".join(["Unit", " 1"])
+    devices = [Device({"UnitName": "".join(["Unit", " 1"])}) for _ in range(3)]
+    assert devices[0].UnitName is not devices[1].UnitName
+    table.extend(1, devices)
+    values = table.column("UnitName")
+    assert values == [unit, unit, unit]
+    assert values[0] is values[1] is values[2]
+
+
+def test_extend_updates_counts():
+    """Test appending rows is reflected in later counts."""
+    table = make_table()
+    assert table.count(Type=DEVICE_TYPE.DOOR_PHONE) == 3
+    table.extend(3, [Device({"Type": "1"})])
+    assert table.count(Type=DEVICE_TYPE.DOOR_PHONE) == 4
+
+
+def test_extend_filtered_view_raises():
+    """Test a filtered view cannot be extended."""
+    view = make_table().filter(Type=DEVICE_TYPE.DOOR_PHONE)
+    with pytest.raises(ValueError) as excinfo:
+        view.extend(1, [])
+    assert "filtered" in str(excinfo.value)
+
+
+def test_invalid_column_raises():
+    """Test unknown column names raise ValueError."""
+    table = make_table()
+    with pytest.raises(ValueError) as excinfo:
+        table.filter(Bogus="x")
+    assert "Invalid column" in str(excinfo.value)
+    with pytest.raises(ValueError):
+        table.group_count("Bogus")
+
+
+def test_many_distinct_values():
+    """Test columns with many distinct values switch to wider codes."""
+    table = DeviceTable()
+    table.extend(1, [Device({"ID": i, "Type": "1"}) for i in range(300)])
+    table.extend(2, [Device({"ID": 7, "Type": "2"})])
+    # The bytes of codes 256 and 0 contain those of code 1 across rows
+    table.extend(3, [Device({"ID": 256, "Type": "1"}), Device({"ID": 0, "Type": "1"})])
+    ids = table._columns["ID"]
+    assert not ids.byte_coded
+    assert table._columns["Type"].byte_coded
+    assert table.count(ID="7") == 2
+    assert table.count(ID="299", CommunityID=1) == 1
+    assert table.count(ID="1") == 1
+    assert table.filter(Type=DEVICE_TYPE.INDOOR_MONITOR).column("ID") == ["7"]
+    assert table.group_count("ID")["7"] == 2
+    assert table.group_count("Type") == {
+        DEVICE_TYPE.DOOR_PHONE: 302,
+        DEVICE_TYPE.INDOOR_MONITOR: 1,
+    }
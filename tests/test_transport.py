@@ -0,0 +1,180 @@
+# SPDX-License-Identifier: Apache-2.0
+# SPDX-FileCopyrightText: 2025 Andrew Grimberg <tykeal@bardicgrove.org>
+"""Tests for the Akuvox HTTP/2 transport module."""
+
+import pickle
+import sys
+from unittest.mock import MagicMock, patch
+
+import httpx
+import pytest
+
+from pyakuvox import _forksafe
+from pyakuvox.auth import Auth
+from pyakuvox.breaker import CIRCUIT_STATE, CircuitBreaker
+from pyakuvox.const import RESULT_SUCCESS, SUBDOMAINS_LIST
+from pyakuvox.exceptions import DeadlineExceededError, RequestFailedError
+from pyakuvox.transport import HTTP2Transport
+
+
+HTTP2 = {"http_version": b"HTTP/2"}
+
+
+def make_transport(handler):
+    """Build a transport answering requests with a handler."""
+    return HTTP2Transport(transport=httpx.MockTransport(handler))
+
+
+def test_missing_httpx_explains_extra():
+    """Test a helpful error is raised when httpx is not installed."""
+    with patch.dict(sys.modules, {"httpx": None}):
+        with pytest.raises(ImportError) as excinfo:
+            HTTP2Transport()
+    assert "pyakuvox[http2]" in str(excinfo.value)
+
+
+def test_auth_requests_use_transport():
+    """Test Auth sends its requests through the transport."""
+    seen = []
+
+    def handler(request):
+        """Answer the login and a listing."""
+        seen.append(request)
+        if request.url.path == "/property/login":
+            return httpx.Response(
+                200, json={"result": RESULT_SUCCESS, "token": "t"}, extensions=HTTP2
+            )
+        return httpx.Response(
+            200, json={"result": RESULT_SUCCESS, "data": [1]}, extensions=HTTP2
+        )
+
+    transport = make_transport(handler)
+    auth = Auth(SUBDOMAINS_LIST[0], "user", "pass", timeout=5, transport=transport)
+    assert transport.uses_http2(auth.base_url) is None
+    assert auth.requests("GET", "/property/comunityinfo", params={"a": "b"}) == {
+        "result": RESULT_SUCCESS,
+        "data": [1],
+    }
+    assert [r.url.path for r in seen] == ["/property/login", "/property/comunityinfo"]
+    assert seen[1].headers["x-auth-token"] == "t"
+    assert seen[1].url.params["a"] == "b"
+    assert transport.uses_http2(auth.base_url) is True
+    transport.close()
+
+
+def test_http1_servers_fall_back_to_requests():
+    """Test servers answering with HTTP/1.1 are then sent through requests."""
+    seen = []
+
+    def handler(request):
+        """Answer with HTTP/1.1."""
+        seen.append(request)
+        return httpx.Response(200, json={"result": RESULT_SUCCESS})
+
+    transport = make_transport(handler)
+    url = "https://api.test/property/login"
+    transport.request("POST", url, timeout=5, json={}, verify=True)
+    assert transport.uses_http2(url) is False
+
+    fallback = MagicMock()
+    with patch(
+        "pyakuvox.transport.requests.request", return_value=fallback
+    ) as mock_request:
+        assert transport.request("GET", url, timeout=(1, 2), verify=True) is fallback
+    mock_request.assert_called_once_with("GET", url, timeout=(1, 2), verify=True)
+    fallback.raise_for_status.assert_called_once_with()
+    assert len(seen) == 1
+    # Other servers are probed separately
+    assert transport.uses_http2("https://other.test/") is None
+
+
+def test_timeout_pair_is_applied():
+    """Test (connect, read) timeouts map to the httpx timeout."""
+    seen = []
+
+    def handler(request):
+        """Record the request timeouts."""
+        seen.append(request.extensions["timeout"])
+        return httpx.Response(200, json={"result": RESULT_SUCCESS})
+
+    make_transport(handler).request("GET", "https://api.test/", timeout=(3, 7))
+    assert seen[0]["connect"] == 3
+    assert seen[0]["read"] == 7
+
+
+def test_http_errors_are_request_failures():
+    """Test HTTP status errors surface as request failures."""
+    transport = make_transport(lambda request: httpx.Response(503))
+    auth = Auth(SUBDOMAINS_LIST[0], "user", "pass", transport=transport)
+    with pytest.raises(RequestFailedError) as excinfo:
+        auth.authenticate()
+    assert "503" in str(excinfo.value)
+
+
+def test_non_json_responses_are_request_failures():
+    """Test an HTTP/2 response that is not JSON surfaces as a request failure."""
+
+    def handler(request):
+        """Answer with an HTML page, as a proxy might."""
+        return httpx.Response(200, text="<html>Bad gateway</html>", extensions=HTTP2)
+
+    breaker = CircuitBreaker(minimum_calls=1)
+    auth = Auth(
+        SUBDOMAINS_LIST[0],
+        "user",
+        "pass",
+        breaker=breaker,
+        transport=make_transport(handler),
+    )
+    with pytest.raises(RequestFailedError) as excinfo:
+        auth.authenticate()
+    assert "Invalid JSON response" in str(excinfo.value)
+    # The breaker counts it as a failure
+    assert breaker.state(auth.base_url, "/property/login") == CIRCUIT_STATE.OPEN
+
+
+def test_timeouts_are_mapped():
+    """Test httpx timeouts are handled like requests timeouts."""
+
+    def handler(request):
+        """Time out every request."""
+        raise httpx.ReadTimeout("slow", request=request)
+
+    auth = Auth(SUBDOMAINS_LIST[0], "user", "pass", transport=make_transport(handler))
+    with pytest.raises(RequestFailedError):
+        auth.authenticate()
+    with patch("pyakuvox.deadline.Deadline.expired", True):
+        with pytest.raises(DeadlineExceededError):
+            auth.authenticate(deadline=30)
+
+
+def test_pickle_and_fork_create_new_client():
+    """Test a pickled or forked transport starts its own client when used."""
+    transport = HTTP2Transport(headers={"x-test": "1"})
+    assert transport._client is None
+    client, loop = transport._start_client()
+    assert transport._start_client() == (client, loop)
+    assert transport in _forksafe._TRACKED
+
+    transport._http2["https://api.test"] = False
+    restored = pickle.loads(pickle.dumps(transport))
+    assert restored._options == {"headers": {"x-test": "1"}}
+    assert restored.uses_http2("https://api.test/") is None
+    assert restored._client is None
+    assert restored._start_client()[0].headers["x-test"] == "1"
+    restored.close()
+
+    # The fork handler only drops the parent's client, without I/O
+    _forksafe._after_fork_in_child()
+    assert transport._client is None
+    assert transport._thread is None
+    assert transport._start_client()[0] is not client
+    transport.close()
+    loop.call_soon_threadsafe(loop.stop)
+
+
+def test_close_unused_transport():
+    """Test closing a transport that never sent a request does nothing."""
+    transport = HTTP2Transport()
+    transport.close()
+    assert transport._client is None